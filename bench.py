@@ -0,0 +1,257 @@
+"""Benchmark the API against a local Mongo stand-in with seeded data.
+
+Runs the app in-process over ASGI, so no server or network is involved. Uses
+mongomock-motor unless --mongo-url points at a real (ephemeral) mongod.
+
+    python bench.py --tools 100000 --posts 50000 --output bench_output.txt
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import types
+import uuid
+from datetime import datetime, timedelta
+
+CATEGORIES = ["Email Marketing", "Sales", "Analytics", "Productivity", "Design", "Affiliate Marketing"]
+PRICING = ["Free", "Freemium", "Paid", "Free trial, then paid", "Open source"]
+WORDS = ["crm", "email", "automation", "analytics", "pipeline", "design", "workflow", "campaign",
+         "dashboard", "reporting", "collaboration", "invoicing", "landing", "forms", "chat", "seo"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the SaaS Tools Digital API")
+    parser.add_argument("--tools", type=int, default=100_000)
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=500, help="requests per read scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--bulk-topics", type=int, default=20)
+    parser.add_argument("--bulk-workers", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per fake LLM call")
+    parser.add_argument("--mongo-url", default=None, help="real mongod to use instead of mongomock-motor")
+    parser.add_argument("--no-response-cache", action="store_true", help="measure every request against Mongo")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="write JSON results here instead of stdout")
+    return parser.parse_args()
+
+def configure_environment(args):
+    """Must run before main is imported, since the app reads its config at import time"""
+    os.environ["MONGO_URL"] = args.mongo_url or "mongodb://localhost:27017"
+    os.environ["DB_NAME"] = f"bench_{uuid.uuid4().hex[:8]}"
+    os.environ.pop("OPENAI_API_KEY", None)
+    # The fake LLM has its own latency; don't let the production rate limit dominate the numbers
+    os.environ.setdefault("OPENAI_RATE_PER_SECOND", "1000")
+    os.environ.setdefault("OPENAI_RATE_BURST", "1000")
+    os.environ.setdefault("SERVER_TIMING_ENABLED", "false")
+    os.environ.setdefault("INDEX_CHECK_ON_STARTUP", "false")
+    # Every benchmark request comes from one client; measure the handlers, not the limiter
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    if args.no_response_cache:
+        os.environ["CACHE_TTL_SECONDS"] = "0"
+        os.environ["STATS_CACHE_SECONDS"] = "0"
+    if not args.mongo_url:
+        try:
+            import mongomock_motor
+        except ImportError:
+            sys.exit("mongomock-motor is not installed; pip install mongomock-motor or pass --mongo-url")
+        import motor.motor_asyncio
+        motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+
+class FakeLLM:
+    """Stands in for AsyncOpenAI: sleeps for the configured latency and returns canned content"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.chat = types.SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        content = "<h2>Overview</h2>" + "<p>" + " ".join(random.choices(WORDS, k=400)) + "</p>"
+        usage = types.SimpleNamespace(prompt_tokens=200, completion_tokens=600)
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+    async def close(self):
+        pass
+
+def make_tool(index: int, now: datetime) -> dict:
+    name = f"{random.choice(WORDS).title()} {random.choice(WORDS).title()} {index}"
+    return {
+        "id": str(uuid.uuid4()),
+        "name": name,
+        "category": random.choice(CATEGORIES),
+        "description": " ".join(random.choices(WORDS, k=20)),
+        "pricing": random.choice(PRICING),
+        "features": random.sample(WORDS, 4),
+        "pros": random.sample(WORDS, 3),
+        "cons": random.sample(WORDS, 2),
+        "rating": round(random.uniform(3.0, 5.0), 1),
+        "affiliate_link": f"https://example.com/go/{index}",
+        "logo_url": f"https://example.com/logo/{index}.png",
+        "website_url": f"https://example.com/{index}",
+        "created_at": now - timedelta(minutes=index),
+        "updated_at": now - timedelta(minutes=index),
+    }
+
+def make_post(index: int, now: datetime) -> dict:
+    title = f"{random.choice(WORDS).title()} guide {index}"
+    content = "<p>" + " ".join(random.choices(WORDS, k=800)) + "</p>"
+    return {
+        "id": str(uuid.uuid4()),
+        "title": title,
+        "slug": f"bench-post-{index}",
+        "content": content,
+        "excerpt": content[:200] + "...",
+        "category": random.choice(CATEGORIES),
+        "tags": random.sample(WORDS, 3),
+        "featured_image": f"https://example.com/img/{index}.jpg",
+        "meta_title": title,
+        "meta_description": title,
+        "author": "SaaS Tools Team",
+        "published": True,
+        "featured": index < 3,
+        "views": 0,
+        "affiliate_links": [],
+        "created_at": now - timedelta(minutes=index),
+        "updated_at": now - timedelta(minutes=index),
+    }
+
+async def seed(db, tools: int, posts: int, batch_size: int = 5000):
+    now = datetime.utcnow()
+    for collection, count, factory in ((db.saas_tools, tools, make_tool), (db.blog_posts, posts, make_post)):
+        for start in range(0, count, batch_size):
+            docs = [factory(index, now) for index in range(start, min(start + batch_size, count))]
+            await collection.insert_many(docs, ordered=False)
+
+def summarize(latencies, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+
+    def percentile(fraction: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(0.50) * 1000, 3),
+        "p90_ms": round(percentile(0.90) * 1000, 3),
+        "p99_ms": round(percentile(0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+async def run_scenario(client, make_request, total: int, concurrency: int) -> dict:
+    """Issue total requests from concurrency workers; make_request(i) returns (method, url, kwargs)"""
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            method, url, kwargs = make_request(index)
+            started_at = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started_at)
+            if response.status_code >= 400:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started_at)
+
+async def run(args) -> dict:
+    import httpx
+    import main
+
+    # Per-request log lines from the client would swamp the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    random.seed(args.seed)
+    fake_llm = FakeLLM(args.llm_latency)
+    main.openai_client = fake_llm
+    main.AI_ENABLED = True
+
+    # Startup opens the Mongo client, so seeding has to wait for it
+    await main.app.router.startup()
+    try:
+        seed_started_at = time.perf_counter()
+        await seed(main.db, args.tools, args.posts)
+        seed_seconds = time.perf_counter() - seed_started_at
+
+        # Build the search index up front so search requests don't hit the regex fallback
+        await main.tool_search_index.refresh(main.db.saas_tools)
+        await main.refresh_recommendation_indexes()
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            deep_skip = max(0, args.tools - 100)
+            scenarios = {
+                "tools": lambda i: ("GET", "/api/tools", {"params": {"category": random.choice(CATEGORIES), "skip": random.randrange(0, 200)}}),
+                "tools_search": lambda i: ("GET", "/api/tools", {"params": {"search": " ".join(random.sample(WORDS, 2))}}),
+                "tools_deep_skip": lambda i: ("GET", "/api/tools", {"params": {"skip": random.randrange(deep_skip // 2, deep_skip + 1)}}),
+                "blog_post_view": lambda i: ("GET", f"/api/blog/bench-post-{random.randrange(max(1, args.posts))}", {}),
+                "stats": lambda i: ("GET", "/api/stats", {}),
+                "related": lambda i: ("GET", f"/api/blog/bench-post-{random.randrange(max(1, args.posts))}/related", {}),
+            }
+            results = {}
+            for name, make_request in scenarios.items():
+                results[name] = await run_scenario(client, make_request, args.requests, args.concurrency)
+
+            topics = [{"title": f"Bench topic {uuid.uuid4().hex[:8]}", "category": random.choice(CATEGORIES)} for _ in range(args.bulk_topics)]
+            calls_before = fake_llm.calls
+            started_at = time.perf_counter()
+            response = await client.post(
+                "/api/blog/bulk-generate",
+                json={"topics": topics, "workers": args.bulk_workers, "force_refresh": True},
+                timeout=None
+            )
+            elapsed = time.perf_counter() - started_at
+            results["bulk_generate"] = {
+                "status_code": response.status_code,
+                "topics": args.bulk_topics,
+                "workers": args.bulk_workers,
+                "llm_calls": fake_llm.calls - calls_before,
+                "elapsed_seconds": round(elapsed, 4),
+                "posts_per_second": round(args.bulk_topics / elapsed, 2) if elapsed else 0.0,
+                "summary": response.json() if response.status_code == 200 else response.text,
+            }
+    finally:
+        await main.client.drop_database(main.db.name)
+        await main.app.router.shutdown()
+
+    return {
+        "started_at": datetime.utcnow().isoformat(),
+        "config": {
+            "tools": args.tools,
+            "posts": args.posts,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "llm_latency": args.llm_latency,
+            "backend": "mongod" if args.mongo_url else "mongomock-motor",
+            "response_cache": not args.no_response_cache,
+            "seed": args.seed,
+        },
+        "seed_seconds": round(seed_seconds, 3),
+        "cache": main.response_cache.stats(),
+        "results": results,
+    }
+
+if __name__ == "__main__":
+    args = parse_args()
+    configure_environment(args)
+    report = json.dumps(asyncio.run(run(args)), indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
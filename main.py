@@ -1,35 +1,277 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, Response, PlainTextResponse
+from starlette.datastructures import Headers, MutableHeaders
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne, IndexModel, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
+import sys
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional, Dict, Any, Union, Iterable, Mapping, Tuple
 import uuid
-from datetime import datetime
+import time
+import socket
+import hashlib
+import threading
+import contextvars
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import gzip
 import asyncio
-from openai import OpenAI
+from openai import AsyncOpenAI
+import httpx
 from slugify import slugify
 import json
+import orjson
+import csv
+import base64
 import re
 import random
+import bisect
+import functools
+import string
+from types import MappingProxyType
+from collections import OrderedDict
+import heapq
+from urllib.parse import parse_qsl
+import math
+import numpy as np
+import html
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Worker process; each uvicorn worker imports this module separately
+WEB_CONCURRENCY = max(1, int(os.environ.get('WEB_CONCURRENCY', 1)))
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+
+# Metrics
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Metrics:
+    """Minimal thread-safe registry of counters, gauges and histograms rendered in Prometheus text format"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.descriptions: Dict[str, tuple] = {}
+        self.samples: Dict[str, Dict[tuple, Any]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self.descriptions[name] = (kind, help_text)
+        self.samples.setdefault(name, {})
+
+    def inc(self, name: str, labels: Dict[str, str] = None, amount: float = 1):
+        key = tuple(sorted((labels or {}).items()))
+        with self.lock:
+            self.samples[name][key] = self.samples[name].get(key, 0) + amount
+
+    def set(self, name: str, labels: Dict[str, str] = None, value: float = 0):
+        key = tuple(sorted((labels or {}).items()))
+        with self.lock:
+            self.samples[name][key] = value
+
+    def observe(self, name: str, labels: Dict[str, str], value: float):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            histogram = self.samples[name].get(key)
+            if histogram is None:
+                # One counter per bucket, then sum and count
+                histogram = self.samples[name][key] = [0] * len(LATENCY_BUCKETS) + [0.0, 0]
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def value(self, name: str, labels: Dict[str, str] = None) -> Any:
+        with self.lock:
+            return self.samples[name].get(tuple(sorted((labels or {}).items())), 0)
+
+    def render(self) -> str:
+        def label_text(labels: tuple, extra: tuple = ()) -> str:
+            # Every worker keeps its own registry; sum over the worker label for totals
+            pairs = (("worker", WORKER_ID),) + labels + extra
+            return "{" + ",".join(f'{key}="{str(value)}"' for key, value in pairs) + "}"
+        
+        lines = []
+        with self.lock:
+            for name, (kind, help_text) in self.descriptions.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in self.samples[name].items():
+                    if kind != "histogram":
+                        lines.append(f"{name}{label_text(labels)} {value}")
+                        continue
+                    for index, bound in enumerate(LATENCY_BUCKETS):
+                        lines.append(f"{name}_bucket{label_text(labels, (('le', bound),))} {value[index]}")
+                    lines.append(f"{name}_bucket{label_text(labels, (('le', '+Inf'),))} {value[-1]}")
+                    lines.append(f"{name}_sum{label_text(labels)} {value[-2]}")
+                    lines.append(f"{name}_count{label_text(labels)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.describe("http_requests_total", "counter", "HTTP requests by method, route and status")
+metrics.describe("http_request_duration_seconds", "histogram", "HTTP request latency by method and route")
+metrics.describe("http_requests_in_flight", "gauge", "HTTP requests currently being served")
+metrics.describe("mongo_command_duration_seconds", "histogram", "MongoDB command latency by command and collection")
+metrics.describe("mongo_command_failures_total", "counter", "Failed MongoDB commands by command and collection")
+metrics.describe("llm_request_duration_seconds", "histogram", "OpenAI request latency by model and mode")
+metrics.describe("llm_requests_total", "counter", "OpenAI requests by model and status")
+metrics.describe("llm_tokens_total", "counter", "OpenAI tokens used by model and type")
+metrics.describe("llm_cache_hits_total", "counter", "Completions served from the generation cache")
+metrics.describe("llm_requests_in_flight", "gauge", "OpenAI requests currently holding a concurrency slot")
+metrics.describe("mongo_pool_connections", "gauge", "Open MongoDB pool connections")
+metrics.describe("mongo_pool_checked_out", "gauge", "MongoDB pool connections currently checked out")
+metrics.describe("mongo_pool_checkout_failures_total", "counter", "Failed MongoDB connection checkouts by reason")
+metrics.describe("mongo_pool_cleared_total", "counter", "MongoDB connection pool clears")
+metrics.describe("rate_limit_decisions_total", "counter", "Rate limiter decisions by rule and outcome")
+metrics.describe("rate_limit_clients", "gauge", "Client buckets tracked by the rate limiter")
+metrics.describe("coalesced_requests_total", "counter", "Requests that joined an identical in-flight execution")
+
+# Per-request time spent in Mongo and the LLM, reported in the Server-Timing header
+request_timings: contextvars.ContextVar = contextvars.ContextVar("request_timings", default=None)
+
+def add_request_timing(kind: str, seconds: float):
+    timings = request_timings.get()
+    if timings is not None:
+        with metrics.lock:
+            timings[kind] = timings.get(kind, 0.0) + seconds
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command Motor issues; Motor copies contextvars into its executor threads"""
+
+    def __init__(self):
+        self.collections: Dict[int, str] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.command.get("collection", "")
+        self.collections[event.request_id] = collection
+
+    def succeeded(self, event):
+        self.record(event, failed=False)
+
+    def failed(self, event):
+        self.record(event, failed=True)
+
+    def record(self, event, failed: bool):
+        labels = {"command": event.command_name, "collection": self.collections.pop(event.request_id, "")}
+        seconds = event.duration_micros / 1_000_000
+        metrics.observe("mongo_command_duration_seconds", labels, seconds)
+        if failed:
+            metrics.inc("mongo_command_failures_total", labels)
+        add_request_timing("mongo", seconds)
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Tracks open and checked-out pool connections so /health can report saturation"""
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        metrics.inc("mongo_pool_cleared_total")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        metrics.inc("mongo_pool_connections")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        metrics.inc("mongo_pool_connections", amount=-1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        metrics.inc("mongo_pool_checkout_failures_total", {"reason": str(event.reason)})
+
+    def connection_checked_out(self, event):
+        metrics.inc("mongo_pool_checked_out")
+
+    def connection_checked_in(self, event):
+        metrics.inc("mongo_pool_checked_out", amount=-1)
+
+# MongoDB connection, opened per worker at startup so no client is shared across a fork
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 50))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 5))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 30000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.environ.get('HEALTH_CHECK_TIMEOUT_SECONDS', 2))
+client = None
+db = None
+
+def connect_to_mongo():
+    global client, db
+    if client is None:
+        client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'],
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+            socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            event_listeners=[MongoCommandMetrics(), MongoPoolMetrics()]
+        )
+        db = client[os.environ['DB_NAME']]
 
 # OpenAI client - Updated to handle API key properly
+OPENAI_TIMEOUT_SECONDS = float(os.environ.get('OPENAI_TIMEOUT_SECONDS', 60))
+OPENAI_MAX_CONCURRENCY = int(os.environ.get('OPENAI_MAX_CONCURRENCY', 4))
+OPENAI_RATE_PER_SECOND = float(os.environ.get('OPENAI_RATE_PER_SECOND', 2))
+OPENAI_RATE_BURST = int(os.environ.get('OPENAI_RATE_BURST', 4))
+GENERATION_CACHE_ENABLED = os.environ.get('GENERATION_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+GENERATION_CACHE_MAX_BYTES = int(os.environ.get('GENERATION_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+BULK_GENERATE_WORKERS = int(os.environ.get('BULK_GENERATE_WORKERS', 4))
+BULK_INSERT_BATCH_SIZE = int(os.environ.get('BULK_INSERT_BATCH_SIZE', 50))
+BULK_UPDATE_BATCH_SIZE = int(os.environ.get('BULK_UPDATE_BATCH_SIZE', 50))
+NEWSLETTER_IMPORT_BATCH_SIZE = int(os.environ.get('NEWSLETTER_IMPORT_BATCH_SIZE', 1000))
+TOOL_IMPORT_BATCH_SIZE = int(os.environ.get('TOOL_IMPORT_BATCH_SIZE', 1000))
+TOOL_IMPORT_MAX_ERRORS = int(os.environ.get('TOOL_IMPORT_MAX_ERRORS', 20))
+JOB_RUNNER_CONCURRENCY = int(os.environ.get('JOB_RUNNER_CONCURRENCY', 1))
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', 5))
+JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', 60))
+JOB_ITEM_BATCH_SIZE = int(os.environ.get('JOB_ITEM_BATCH_SIZE', 1000))
+SHUTDOWN_TIMEOUT_SECONDS = float(os.environ.get('SHUTDOWN_TIMEOUT_SECONDS', 10))
+OPENAI_HTTP2 = os.environ.get('OPENAI_HTTP2', 'true').lower() in ('1', 'true', 'yes')
+OPENAI_MAX_CONNECTIONS = int(os.environ.get('OPENAI_MAX_CONNECTIONS', 20))
 openai_client = None
 AI_ENABLED = False
-if os.environ.get('OPENAI_API_KEY'):
+
+def connect_to_openai():
+    """Build the OpenAI client on a pooled httpx client, multiplexed over HTTP/2 when h2 is installed"""
+    global openai_client, AI_ENABLED
+    if openai_client is not None or not os.environ.get('OPENAI_API_KEY'):
+        return
+    http2 = OPENAI_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logging.warning("OPENAI_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+            http2 = False
     try:
-        openai_client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+        http_client = httpx.AsyncClient(
+            http2=http2,
+            timeout=OPENAI_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS, max_keepalive_connections=OPENAI_MAX_CONNECTIONS)
+        )
+        openai_client = AsyncOpenAI(api_key=os.environ.get('OPENAI_API_KEY'), timeout=OPENAI_TIMEOUT_SECONDS, http_client=http_client)
         AI_ENABLED = True
     except Exception as e:
         logging.error(f"OpenAI initialization failed: {e}")
@@ -81,6 +323,33 @@ class BlogPost(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class BlogPostSummary(BaseModel):
+    id: str
+    title: str
+    slug: str
+    excerpt: str
+    category: str
+    tags: List[str] = []
+    featured_image: str
+    featured: bool = False
+    created_at: datetime
+
+def model_projection(model) -> Dict[str, int]:
+    """Project exactly a model's fields so stored documents can be served without re-validation"""
+    return {"_id": 0, **{field: 1 for field in model.model_fields}}
+
+SAAS_TOOL_PROJECTION = model_projection(SaaSTool)
+BLOG_POST_PROJECTION = model_projection(BlogPost)
+BLOG_SUMMARY_PROJECTION = model_projection(BlogPostSummary)
+
+class SaaSToolPage(BaseModel):
+    items: List[SaaSTool]
+    next_cursor: Optional[str] = None
+
+class BlogPostSummaryPage(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
 class NewsletterSubscription(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     email: str
@@ -94,6 +363,39 @@ class BlogPostCreate(BaseModel):
     tags: List[str] = []
     generate_content: bool = True
 
+class BlogTopic(BaseModel):
+    title: str
+    category: str
+
+class BulkGenerateRequest(BaseModel):
+    topics: List[BlogTopic] = []
+    workers: Optional[int] = Field(None, ge=1, le=32)
+    force_refresh: bool = False
+
+class JobItem(BaseModel):
+    title: str
+    category: str
+    post_id: Optional[str] = None
+    tags: List[str] = []
+    status: str = "pending"
+    slug: Optional[str] = None
+    error: Optional[str] = None
+
+class Job(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    type: str
+    status: str = "queued"
+    params: Dict[str, Any] = {}
+    items: List[JobItem] = []
+    progress: Dict[str, int] = {}
+    idempotency_key: Optional[str] = None
+    fingerprint: str = ""
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
 class BlogPostUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
@@ -102,16 +404,21 @@ class BlogPostUpdate(BaseModel):
     published: Optional[bool] = None
     featured: Optional[bool] = None
 
-# Affiliate link generator
-def get_affiliate_links(category: str, tool_name: str = "") -> dict:
-    """Generate affiliate links based on category and tool"""
-    base_links = {
-        "mailmodo": "https://www.mailmodo.com/?fpr=adrian55",
-        "cj_affiliate": "https://www.cj.com/advertiser-signup"
-    }
-    
-    # Category-specific affiliate opportunities
-    category_links = {
+# Fallback article render caches
+FALLBACK_RENDER_CACHE_SIZE = int(os.environ.get('FALLBACK_RENDER_CACHE_SIZE', 4096))
+# Categories come from clients, so the per-category cache needs a bound too
+CATEGORY_TEMPLATE_CACHE_SIZE = int(os.environ.get('CATEGORY_TEMPLATE_CACHE_SIZE', 256))
+
+# Affiliate link registry, built once at import and shared read-only
+BASE_AFFILIATE_LINKS = MappingProxyType({
+    "mailmodo": "https://www.mailmodo.com/?fpr=adrian55",
+    "cj_affiliate": "https://www.cj.com/advertiser-signup"
+})
+
+# Category-specific affiliate opportunities
+CATEGORY_AFFILIATE_LINKS = MappingProxyType({
+    category: MappingProxyType({**BASE_AFFILIATE_LINKS, **links})
+    for category, links in {
         "Marketing": {
             "mailchimp": "https://mailchimp.com/pricing/",
             "hubspot": "https://www.hubspot.com/pricing",
@@ -127,69 +434,83 @@ def get_affiliate_links(category: str, tool_name: str = "") -> dict:
             "monday": "https://monday.com/pricing",
             "notion": "https://www.notion.so/pricing"
         }
-    }
-    
-    links = base_links.copy()
-    if category in category_links:
-        links.update(category_links[category])
-    
-    return links
+    }.items()
+})
 
-# Enhanced content generation with affiliate links
-def generate_html_content_with_affiliates(title: str, category: str, tags: List[str]) -> tuple:
-    """Generate rich HTML content with integrated affiliate links"""
-    
-    affiliate_links = get_affiliate_links(category)
-    
-    # Generate unique, category-specific content
-    category_data = {
-        "Marketing": {
-            "pain_points": "low conversion rates, poor lead quality, ineffective email campaigns",
-            "solutions": ["email marketing automation", "lead scoring", "A/B testing", "customer segmentation"],
-            "roi_metrics": "300% increase in lead conversion, 45% reduction in CAC",
-            "tools": ["Mailmodo", "HubSpot", "Mailchimp", "ConvertKit"],
-            "price_range": "$29-$299/month"
-        },
-        "Sales": {
-            "pain_points": "lost leads, poor pipeline visibility, manual data entry",
-            "solutions": ["CRM automation", "pipeline management", "lead tracking", "sales forecasting"],
-            "roi_metrics": "40% increase in sales velocity, 60% improvement in close rates",
-            "tools": ["Salesforce", "Pipedrive", "HubSpot CRM", "Zoho CRM"],
-            "price_range": "$25-$150/month"
-        },
-        "Productivity": {
-            "pain_points": "missed deadlines, poor team coordination, scattered workflows",
-            "solutions": ["project management", "task automation", "team collaboration", "time tracking"],
-            "roi_metrics": "35% improvement in project delivery, 50% reduction in missed deadlines",
-            "tools": ["Asana", "Monday.com", "Notion", "ClickUp"],
-            "price_range": "$8-$24/month"
-        }
+def get_affiliate_links(category: str, tool_name: str = "") -> Mapping[str, str]:
+    """Get the read-only affiliate links for a category"""
+    return CATEGORY_AFFILIATE_LINKS.get(category, BASE_AFFILIATE_LINKS)
+
+# Category content registry for the fallback generator
+CATEGORY_DATA = MappingProxyType({
+    "Marketing": {
+        "pain_points": "low conversion rates, poor lead quality, ineffective email campaigns",
+        "solutions": ("email marketing automation", "lead scoring", "A/B testing", "customer segmentation"),
+        "roi_metrics": "300% increase in lead conversion, 45% reduction in CAC",
+        "tools": ("Mailmodo", "HubSpot", "Mailchimp", "ConvertKit"),
+        "price_range": "$29-$299/month"
+    },
+    "Sales": {
+        "pain_points": "lost leads, poor pipeline visibility, manual data entry",
+        "solutions": ("CRM automation", "pipeline management", "lead tracking", "sales forecasting"),
+        "roi_metrics": "40% increase in sales velocity, 60% improvement in close rates",
+        "tools": ("Salesforce", "Pipedrive", "HubSpot CRM", "Zoho CRM"),
+        "price_range": "$25-$150/month"
+    },
+    "Productivity": {
+        "pain_points": "missed deadlines, poor team coordination, scattered workflows",
+        "solutions": ("project management", "task automation", "team collaboration", "time tracking"),
+        "roi_metrics": "35% improvement in project delivery, 50% reduction in missed deadlines",
+        "tools": ("Asana", "Monday.com", "Notion", "ClickUp"),
+        "price_range": "$8-$24/month"
     }
-    
-    # Get category-specific data or use default
-    data = category_data.get(category, {
-        "pain_points": "operational inefficiencies, high costs, poor scalability",
-        "solutions": ["automation", "integration", "analytics", "optimization"],
-        "roi_metrics": "250% ROI improvement, 40% cost reduction",
-        "tools": ["Premium Solution", "Business Pro", "Enterprise Suite"],
-        "price_range": "$50-$200/month"
-    })
-    
-    # Generate comprehensive HTML content
-    html_content = f"""
+})
+
+DEFAULT_CATEGORY_DATA = MappingProxyType({
+    "pain_points": "operational inefficiencies, high costs, poor scalability",
+    "solutions": ("automation", "integration", "analytics", "optimization"),
+    "roi_metrics": "250% ROI improvement, 40% cost reduction",
+    "tools": ("Premium Solution", "Business Pro", "Enterprise Suite"),
+    "price_range": "$50-$200/month"
+})
+
+def minify_html(html: str) -> str:
+    """Collapse inter-tag and repeated whitespace"""
+    return re.sub(r"\s+", " ", re.sub(r">\s+<", "><", html)).strip()
+
+class CompiledTemplate:
+    """A str.format-style template parsed once into literal segments and field names"""
+
+    def __init__(self, source: str):
+        self.segments: List[str] = []
+        self.fields: List[str] = []
+        for literal, field, _, _ in string.Formatter().parse(source):
+            self.segments.append(literal)
+            if field is not None:
+                self.fields.append(field)
+
+    def render(self, values: Mapping[str, str]) -> str:
+        parts = []
+        for index, literal in enumerate(self.segments):
+            parts.append(literal)
+            if index < len(self.fields):
+                parts.append(values[self.fields[index]])
+        return "".join(parts)
+
+FALLBACK_ARTICLE_TEMPLATE = CompiledTemplate(minify_html("""
     <article class="blog-content">
         <h1>{title}</h1>
         
         <div class="intro-section">
-            <p>In 2025, businesses struggling with <strong>{data['pain_points']}</strong> are losing millions in potential revenue. This comprehensive guide reveals the top {category.lower()} solutions that deliver measurable results and maximum ROI.</p>
+            <p>In 2025, businesses struggling with <strong>{pain_points}</strong> are losing millions in potential revenue. This comprehensive guide reveals the top {category_lower} solutions that deliver measurable results and maximum ROI.</p>
         </div>
         
         <h2>The Business Impact of {category} Tools</h2>
-        <p>Companies using advanced {category.lower()} platforms report <strong>{data['roi_metrics']}</strong>. The right solution can transform your operations and drive sustainable growth.</p>
+        <p>Companies using advanced {category_lower} platforms report <strong>{roi_metrics}</strong>. The right solution can transform your operations and drive sustainable growth.</p>
         
         <div class="cta-box">
             <h3>🚀 Ready to Transform Your {category} Strategy?</h3>
-            <p>Start with <a href="{affiliate_links['mailmodo']}" target="_blank" rel="noopener sponsored">Mailmodo's powerful platform</a> and see immediate improvements in your metrics. <strong>Try free for 21 days!</strong></p>
+            <p>Start with <a href="{mailmodo_url}" target="_blank" rel="noopener sponsored">Mailmodo's powerful platform</a> and see immediate improvements in your metrics. <strong>Try free for 21 days!</strong></p>
         </div>
         
         <h2>Top {category} Solutions: Complete Analysis</h2>
@@ -206,23 +527,23 @@ def generate_html_content_with_affiliates(title: str, category: str, tags: List[
                 </thead>
                 <tbody>
                     <tr>
-                        <td><strong>{data['tools'][0]}</strong></td>
+                        <td><strong>{tool_0}</strong></td>
                         <td>Enterprise Teams</td>
-                        <td>{data['price_range']}</td>
+                        <td>{price_range}</td>
                         <td>450% ROI</td>
                         <td>⭐⭐⭐⭐⭐ (4.8/5)</td>
                     </tr>
                     <tr>
-                        <td><strong>{data['tools'][1]}</strong></td>
+                        <td><strong>{tool_1}</strong></td>
                         <td>Growing Businesses</td>
-                        <td>{data['price_range']}</td>
+                        <td>{price_range}</td>
                         <td>380% ROI</td>
                         <td>⭐⭐⭐⭐⭐ (4.7/5)</td>
                     </tr>
                     <tr>
-                        <td><strong>{data['tools'][2]}</strong></td>
+                        <td><strong>{tool_2}</strong></td>
                         <td>Small Teams</td>
-                        <td>{data['price_range']}</td>
+                        <td>{price_range}</td>
                         <td>320% ROI</td>
                         <td>⭐⭐⭐⭐ (4.5/5)</td>
                     </tr>
@@ -232,15 +553,15 @@ def generate_html_content_with_affiliates(title: str, category: str, tags: List[
         
         <h2>Key Features That Drive Results</h2>
         <ul>
-            <li><strong>{data['solutions'][0].title()}</strong> - Essential for scalable operations</li>
-            <li><strong>{data['solutions'][1].title()}</strong> - Critical for ROI optimization</li>
-            <li><strong>{data['solutions'][2].title()}</strong> - Key for competitive advantage</li>
-            <li><strong>{data['solutions'][3].title()}</strong> - Vital for long-term success</li>
+            <li><strong>{solution_0}</strong> - Essential for scalable operations</li>
+            <li><strong>{solution_1}</strong> - Critical for ROI optimization</li>
+            <li><strong>{solution_2}</strong> - Key for competitive advantage</li>
+            <li><strong>{solution_3}</strong> - Vital for long-term success</li>
         </ul>
         
         <h2>Implementation Strategy</h2>
         <ol>
-            <li><strong>Assessment:</strong> Evaluate current {category.lower()} processes</li>
+            <li><strong>Assessment:</strong> Evaluate current {category_lower} processes</li>
             <li><strong>Selection:</strong> Choose based on ROI potential and scalability</li>
             <li><strong>Pilot:</strong> Test with a small team first</li>
             <li><strong>Training:</strong> Ensure proper team adoption</li>
@@ -249,7 +570,7 @@ def generate_html_content_with_affiliates(title: str, category: str, tags: List[
         
         <div class="affiliate-banner">
             <h3>💰 Maximize Your Investment</h3>
-            <p>Join 50,000+ businesses achieving breakthrough results. <a href="{affiliate_links['cj_affiliate']}" target="_blank" rel="noopener sponsored">Explore premium solutions</a> and start your transformation today!</p>
+            <p>Join 50,000+ businesses achieving breakthrough results. <a href="{cj_affiliate_url}" target="_blank" rel="noopener sponsored">Explore premium solutions</a> and start your transformation today!</p>
         </div>
         
         <h2>ROI Analysis: Real Numbers</h2>
@@ -278,14 +599,43 @@ def generate_html_content_with_affiliates(title: str, category: str, tags: List[
         
         <div class="final-cta">
             <h3>🎯 Start Your Transformation Today</h3>
-            <p>Don't let competitors gain the advantage. <a href="{affiliate_links['mailmodo']}" target="_blank" rel="noopener sponsored">Begin with Mailmodo's proven platform</a> and join thousands of businesses already achieving breakthrough results!</p>
+            <p>Don't let competitors gain the advantage. <a href="{mailmodo_url}" target="_blank" rel="noopener sponsored">Begin with Mailmodo's proven platform</a> and join thousands of businesses already achieving breakthrough results!</p>
         </div>
     </article>
-    """
-    
-    # Generate excerpt and meta description
-    excerpt = f"Discover the top {category.lower()} tools that deliver {data['roi_metrics']}. Complete analysis of features, pricing, and ROI potential."
-    meta_description = f"Compare the best {category.lower()} tools for 2025. Features, pricing, ROI analysis, and expert recommendations to maximize your investment."
+    """))
+
+@functools.lru_cache(maxsize=CATEGORY_TEMPLATE_CACHE_SIZE)
+def category_template_values(category: str) -> Mapping[str, str]:
+    """Template values that depend only on the category"""
+    data = CATEGORY_DATA.get(category, DEFAULT_CATEGORY_DATA)
+    affiliate_links = get_affiliate_links(category)
+    values = {
+        "category": category,
+        "category_lower": category.lower(),
+        "pain_points": data["pain_points"],
+        "roi_metrics": data["roi_metrics"],
+        "price_range": data["price_range"],
+        "mailmodo_url": affiliate_links["mailmodo"],
+        "cj_affiliate_url": affiliate_links["cj_affiliate"],
+        "excerpt": f"Discover the top {category.lower()} tools that deliver {data['roi_metrics']}. Complete analysis of features, pricing, and ROI potential.",
+        "meta_description": f"Compare the best {category.lower()} tools for 2025. Features, pricing, ROI analysis, and expert recommendations to maximize your investment."
+    }
+    values.update({f"tool_{index}": tool for index, tool in enumerate(data["tools"][:3])})
+    values.update({f"solution_{index}": solution.title() for index, solution in enumerate(data["solutions"][:4])})
+    return MappingProxyType(values)
+
+@functools.lru_cache(maxsize=FALLBACK_RENDER_CACHE_SIZE)
+def render_fallback_article(title: str, category: str) -> Tuple[str, str, str]:
+    """Render (html, excerpt, meta_description) for a post, memoized per (title, category)"""
+    values = category_template_values(category)
+    html_content = FALLBACK_ARTICLE_TEMPLATE.render({**values, "title": title})
+    return html_content, values["excerpt"], values["meta_description"]
+
+# Enhanced content generation with affiliate links
+def generate_html_content_with_affiliates(title: str, category: str, tags: List[str]) -> tuple:
+    """Generate rich HTML content with integrated affiliate links"""
+    html_content, excerpt, meta_description = render_fallback_article(title, category)
+    affiliate_links = get_affiliate_links(category)
     
     # Prepare affiliate links for database
     affiliate_data = [
@@ -295,24 +645,218 @@ def generate_html_content_with_affiliates(title: str, category: str, tags: List[
     
     return html_content, excerpt, meta_description, affiliate_data
 
-# AI Content Generation with fallback
-async def generate_ai_content(title: str, category: str, tags: List[str] = None) -> Dict[str, Any]:
-    """Generate AI-powered blog content with affiliate links and SEO optimization"""
+def generate_html_content_batch(posts: Iterable[Tuple[str, str]]) -> List[tuple]:
+    """Render fallback content for many (title, category) pairs, sharing memoized output"""
+    return [generate_html_content_with_affiliates(title, category, []) for title, category in posts]
+
+class TokenBucket:
+    """Async token bucket: refills at rate tokens per second up to capacity"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def try_acquire(self) -> float:
+        """Take a token without waiting; returns 0 on success, else seconds until one is available"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+# Caps in-flight LLM calls so generation bursts can't pile up on the event loop
+# Limits are account-wide, so each worker gets an equal share
+OPENAI_WORKER_CONCURRENCY = max(1, OPENAI_MAX_CONCURRENCY // WEB_CONCURRENCY)
+openai_semaphore = asyncio.Semaphore(OPENAI_WORKER_CONCURRENCY)
+openai_rate_limiter = TokenBucket(OPENAI_RATE_PER_SECOND / WEB_CONCURRENCY, max(1, OPENAI_RATE_BURST // WEB_CONCURRENCY))
+
+def record_llm_usage(model: str, usage: Any):
+    if usage is None:
+        return
+    metrics.inc("llm_tokens_total", {"model": model, "type": "prompt"}, usage.prompt_tokens or 0)
+    metrics.inc("llm_tokens_total", {"model": model, "type": "completion"}, usage.completion_tokens or 0)
+
+def record_llm_request(model: str, mode: str, started_at: float, status: str):
+    seconds = time.perf_counter() - started_at
+    metrics.observe("llm_request_duration_seconds", {"model": model, "mode": mode}, seconds)
+    metrics.inc("llm_requests_total", {"model": model, "status": status})
+    add_request_timing("llm", seconds)
+
+async def create_chat_completion(**kwargs):
+    """Run a chat completion without blocking the event loop, bounded by rate, concurrency and timeout"""
+    await openai_rate_limiter.acquire()
+    async with openai_semaphore:
+        started_at = time.perf_counter()
+        metrics.inc("llm_requests_in_flight")
+        try:
+            response = await asyncio.wait_for(
+                openai_client.chat.completions.create(**kwargs),
+                timeout=OPENAI_TIMEOUT_SECONDS
+            )
+        except Exception:
+            record_llm_request(kwargs.get("model"), "completion", started_at, "error")
+            raise
+        finally:
+            metrics.inc("llm_requests_in_flight", amount=-1)
+        record_llm_request(kwargs.get("model"), "completion", started_at, "ok")
+        record_llm_usage(kwargs.get("model"), getattr(response, "usage", None))
+        return response
+
+def generation_cache_key(**kwargs) -> str:
+    """Content address for a completion request: model, messages and sampling parameters"""
+    return hashlib.sha256(json.dumps(kwargs, sort_keys=True).encode()).hexdigest()
+
+# Running byte total of the cache, so writes don't have to sum the whole collection
+GENERATION_CACHE_SIZE_ID = "generation_cache_size"
+
+async def add_generation_cache_size(delta: int) -> int:
+    """Adjust the running cache size, returning the new total"""
+    counter = await db.counters.find_one_and_update(
+        {"_id": GENERATION_CACHE_SIZE_ID},
+        {"$inc": {"bytes": delta}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["bytes"]
+
+async def reconcile_generation_cache_size():
+    """Reset the running size from the collection, picking up entries written before it existed or lost to crashes"""
+    try:
+        totals = await db.generation_cache.aggregate(
+            [{"$group": {"_id": None, "size": {"$sum": "$size"}}}]
+        ).to_list(length=1)
+        await db.counters.update_one(
+            {"_id": GENERATION_CACHE_SIZE_ID},
+            {"$set": {"bytes": totals[0]["size"] if totals else 0}},
+            upsert=True
+        )
+    except Exception as e:
+        logging.error(f"Error reconciling generation cache size: {e}")
+
+async def evict_generation_cache(total: int):
+    """Drop least recently used generations once the cache exceeds GENERATION_CACHE_MAX_BYTES"""
+    excess = total - GENERATION_CACHE_MAX_BYTES
+    if excess <= 0:
+        return
+    keys = []
+    async for entry in db.generation_cache.find({}, {"_id": 0, "key": 1, "size": 1}).sort("last_used_at", 1):
+        keys.append(entry["key"])
+        excess -= entry["size"]
+        if excess <= 0:
+            break
+    freed = 0
+    for key in keys:
+        # Concurrent writers may pick the same victims; only the one that deletes an entry counts its bytes
+        evicted = await db.generation_cache.find_one_and_delete({"key": key}, projection={"_id": 0, "size": 1})
+        freed += evicted["size"] if evicted else 0
+    if freed:
+        await add_generation_cache_size(-freed)
+
+async def read_generation_cache(key: str) -> Optional[str]:
+    try:
+        cached = await db.generation_cache.find_one_and_update(
+            {"key": key},
+            {"$set": {"last_used_at": datetime.utcnow()}, "$inc": {"hits": 1}},
+            projection={"_id": 0, "content": 1}
+        )
+        return cached["content"] if cached else None
+    except Exception as e:
+        logging.error(f"Error reading generation cache: {e}")
+        return None
+
+async def write_generation_cache(key: str, content: str, model: Optional[str]):
+    try:
+        now = datetime.utcnow()
+        size = len(content.encode())
+        previous = await db.generation_cache.find_one_and_update(
+            {"key": key},
+            {"$set": {"content": content, "model": model, "size": size, "last_used_at": now},
+             "$setOnInsert": {"created_at": now, "hits": 0}},
+            projection={"_id": 0, "size": 1},
+            upsert=True
+        )
+        await evict_generation_cache(await add_generation_cache_size(size - (previous["size"] if previous else 0)))
+    except Exception as e:
+        logging.error(f"Error writing generation cache: {e}")
+
+async def cached_chat_completion(force_refresh: bool = False, **kwargs) -> str:
+    """Return completion text, reusing a stored generation for an identical request"""
+    key = generation_cache_key(**kwargs)
+    if GENERATION_CACHE_ENABLED and not force_refresh:
+        cached = await read_generation_cache(key)
+        if cached is not None:
+            metrics.inc("llm_cache_hits_total", {"model": kwargs.get("model")})
+            return cached
     
-    if not AI_ENABLED or not openai_client:
-        # Use enhanced fallback with affiliate links
-        content, excerpt, meta_description, affiliate_links = generate_html_content_with_affiliates(title, category, tags or [])
-        return {
-            "content": content,
-            "excerpt": excerpt,
-            "meta_description": meta_description,
-            "affiliate_links": affiliate_links
-        }
+    response = await create_chat_completion(**kwargs)
+    content = response.choices[0].message.content
     
-    try:
-        affiliate_links = get_affiliate_links(category)
-        
-        prompt = f"""
+    if GENERATION_CACHE_ENABLED:
+        await write_generation_cache(key, content, kwargs.get("model"))
+    return content
+
+async def stream_chat_completion(force_refresh: bool = False, **kwargs):
+    """Yield completion text as it is generated; cached generations arrive as a single piece"""
+    key = generation_cache_key(**kwargs)
+    if GENERATION_CACHE_ENABLED and not force_refresh:
+        cached = await read_generation_cache(key)
+        if cached is not None:
+            metrics.inc("llm_cache_hits_total", {"model": kwargs.get("model")})
+            yield cached
+            return
+    
+    parts = []
+    await openai_rate_limiter.acquire()
+    async with openai_semaphore:
+        started_at = time.perf_counter()
+        status = "error"
+        metrics.inc("llm_requests_in_flight")
+        try:
+            stream = await asyncio.wait_for(
+                openai_client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **kwargs),
+                timeout=OPENAI_TIMEOUT_SECONDS
+            )
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    # The timeout applies per chunk so a stalled stream can't hold a slot forever
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=OPENAI_TIMEOUT_SECONDS)
+                except StopAsyncIteration:
+                    break
+                # With include_usage the final chunk has no choices, only token counts
+                record_llm_usage(kwargs.get("model"), getattr(chunk, "usage", None))
+                piece = chunk.choices[0].delta.content if chunk.choices else None
+                if piece:
+                    parts.append(piece)
+                    yield piece
+            status = "ok"
+        finally:
+            metrics.inc("llm_requests_in_flight", amount=-1)
+            record_llm_request(kwargs.get("model"), "stream", started_at, status)
+    
+    if GENERATION_CACHE_ENABLED:
+        await write_generation_cache(key, "".join(parts), kwargs.get("model"))
+
+def article_completion_request(title: str, category: str) -> Dict[str, Any]:
+    affiliate_links = get_affiliate_links(category)
+    
+    prompt = f"""
         Write a comprehensive, SEO-optimized blog post about "{title}" in the {category} category.
         
         Requirements:
@@ -338,259 +882,1867 @@ async def generate_ai_content(title: str, category: str, tags: List[str] = None)
         
         Make it highly profitable and conversion-focused while remaining valuable and ethical.
         """
-        
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an expert SaaS content writer focused on creating profitable, high-converting blog content with strategic affiliate marketing."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=4000,
-            temperature=0.7
-        )
-        
-        content = response.choices[0].message.content
-        
-        # Generate meta description
-        meta_prompt = f"Write a compelling 150-character meta description for a blog post titled '{title}' in the {category} category. Focus on SEO and conversion optimization."
-        
-        meta_response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an SEO expert who writes compelling meta descriptions for maximum click-through rates."},
-                {"role": "user", "content": meta_prompt}
-            ],
-            max_tokens=100,
-            temperature=0.5
+    
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {"role": "system", "content": "You are an expert SaaS content writer focused on creating profitable, high-converting blog content with strategic affiliate marketing."},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": 4000,
+        "temperature": 0.7
+    }
+
+def meta_completion_request(title: str, category: str) -> Dict[str, Any]:
+    meta_prompt = f"Write a compelling 150-character meta description for a blog post titled '{title}' in the {category} category. Focus on SEO and conversion optimization."
+    
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {"role": "system", "content": "You are an SEO expert who writes compelling meta descriptions for maximum click-through rates."},
+            {"role": "user", "content": meta_prompt}
+        ],
+        "max_tokens": 100,
+        "temperature": 0.5
+    }
+
+def ai_content_result(content: str, meta_description: str, category: str) -> Dict[str, Any]:
+    affiliate_links = get_affiliate_links(category)
+    excerpt = content[:200] + "..." if len(content) > 200 else content
+    
+    return {
+        "content": content,
+        "meta_description": meta_description.strip(),
+        "excerpt": excerpt,
+        "affiliate_links": [
+            {"name": "Mailmodo", "url": affiliate_links["mailmodo"]},
+            {"name": "CJ Affiliate", "url": affiliate_links["cj_affiliate"]}
+        ]
+    }
+
+def fallback_content(title: str, category: str, tags: List[str] = None) -> Dict[str, Any]:
+    content, excerpt, meta_description, affiliate_links = generate_html_content_with_affiliates(title, category, tags or [])
+    return {
+        "content": content,
+        "excerpt": excerpt,
+        "meta_description": meta_description,
+        "affiliate_links": affiliate_links
+    }
+
+# AI Content Generation with fallback
+async def generate_ai_content(title: str, category: str, tags: List[str] = None, force_refresh: bool = False) -> Dict[str, Any]:
+    """Generate AI-powered blog content with affiliate links and SEO optimization"""
+    
+    if not AI_ENABLED or not openai_client:
+        # Use enhanced fallback with affiliate links
+        return fallback_content(title, category, tags)
+    
+    try:
+        # Body and meta description are independent, so request them together
+        content, meta_description = await asyncio.gather(
+            cached_chat_completion(force_refresh, **article_completion_request(title, category)),
+            cached_chat_completion(force_refresh, **meta_completion_request(title, category))
         )
-        
-        meta_description = meta_response.choices[0].message.content.strip()
-        excerpt = content[:200] + "..." if len(content) > 200 else content
-        
-        return {
-            "content": content,
-            "meta_description": meta_description,
-            "excerpt": excerpt,
-            "affiliate_links": [
-                {"name": "Mailmodo", "url": affiliate_links["mailmodo"]},
-                {"name": "CJ Affiliate", "url": affiliate_links["cj_affiliate"]}
-            ]
-        }
+        return ai_content_result(content, meta_description, category)
         
     except Exception as e:
         logging.error(f"OpenAI API error: {e}")
         # Fall back to enhanced content generation
-        content, excerpt, meta_description, affiliate_links = generate_html_content_with_affiliates(title, category, tags or [])
-        return {
-            "content": content,
-            "excerpt": excerpt,
-            "meta_description": meta_description,
-            "affiliate_links": affiliate_links
+        return fallback_content(title, category, tags)
+
+# Tool search index
+TOOL_SEARCH_REFRESH_SECONDS = int(os.environ.get('TOOL_SEARCH_REFRESH_SECONDS', 300))
+TOOL_SEARCH_PREFIX_EXPANSIONS = int(os.environ.get('TOOL_SEARCH_PREFIX_EXPANSIONS', 50))
+SEARCH_TOKEN_RE = re.compile(r"[a-z0-9]+")
+PRICING_TYPES = ("free", "freemium", "trial", "paid", "subscription", "one-time", "open-source", "enterprise")
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric search tokens"""
+    return SEARCH_TOKEN_RE.findall((text or "").lower())
+
+def normalize_pricing_type(pricing: str) -> List[str]:
+    """Map a free-form pricing string onto the known pricing types it mentions"""
+    text = (pricing or "").lower().replace(" ", "-")
+    return [pricing_type for pricing_type in PRICING_TYPES if pricing_type in text]
+
+class ToolSearchIndex:
+    """In-process inverted index over tool names and descriptions with prefix matching"""
+
+    FIELD_WEIGHTS = {"name": 3.0, "description": 1.0}
+    PROJECTION = {"_id": 0, "id": 1, "name": 1, "description": 1, "category": 1, "pricing": 1, "rating": 1}
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.vocabulary: List[str] = []
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.last_updated: Optional[datetime] = None
+        self.ready = False
+
+    def add(self, tool: Dict[str, Any]):
+        tool_id = tool.get("id")
+        if not tool_id:
+            return
+        self.remove(tool_id)
+        weights: Dict[str, float] = {}
+        for field, field_weight in self.FIELD_WEIGHTS.items():
+            for token in tokenize(tool.get(field, "")):
+                weights[token] = weights.get(token, 0.0) + field_weight
+        for token, weight in weights.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                bisect.insort(self.vocabulary, token)
+            # Dampen repeated terms so keyword stuffing doesn't dominate ranking
+            self.postings[token][tool_id] = 1.0 + math.log(weight)
+        self.docs[tool_id] = {
+            "category": tool.get("category"),
+            "pricing_types": set(normalize_pricing_type(tool.get("pricing", ""))),
+            "rating": tool.get("rating") or 0.0,
+            "tokens": list(weights),
         }
 
-# API Endpoints - FIXED ROUTING ORDER
-@api_router.get("/")
-async def root():
-    return {"message": "SaaS Tools Digital API", "status": "operational", "ai_enabled": AI_ENABLED}
+    def remove(self, tool_id: str):
+        doc = self.docs.pop(tool_id, None)
+        if not doc:
+            return
+        for token in doc["tokens"]:
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(tool_id, None)
+            if not posting:
+                del self.postings[token]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
 
-@api_router.get("/health")
-async def health_check():
-    return {"status": "healthy", "service": "SaaS Tools Digital API"}
+    def expand(self, token: str) -> List[str]:
+        """Return indexed terms starting with token, exact match first"""
+        start = bisect.bisect_left(self.vocabulary, token)
+        terms = []
+        for term in self.vocabulary[start:start + TOOL_SEARCH_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms
 
-@api_router.get("/tools", response_model=List[SaaSTool])
-async def get_tools(
-    category: Optional[str] = None,
-    search: Optional[str] = None,
-    pricing_type: Optional[str] = None,
-    limit: int = Query(20, le=100),
-    skip: int = 0
-):
-    """Get SaaS tools with optional filtering"""
-    filter_dict = {}
-    if category:
-        filter_dict["category"] = category
-    if search:
-        filter_dict["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
+    def search(self, query: Optional[str], category: Optional[str] = None, pricing_type: Optional[str] = None, limit: int = 20) -> List[str]:
+        """Return up to limit matching tool ids ordered by relevance, then rating; a None query filters only"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if query and not tokens:
+            # Text like ".*" or "!!!" matches nothing, rather than everything
+            return []
+        scores: Optional[Dict[str, float]] = None
+        total = max(len(self.docs), 1)
+        # Intersect the rarest terms first to keep candidate sets small
+        for token in sorted(tokens, key=lambda t: sum(len(self.postings[term]) for term in self.expand(t))):
+            token_scores: Dict[str, float] = {}
+            for term in self.expand(token):
+                posting = self.postings[term]
+                idf = math.log(1 + total / len(posting))
+                boost = 1.0 if term == token else 0.5
+                for tool_id, weight in posting.items():
+                    if scores is not None and tool_id not in scores:
+                        continue
+                    score = weight * idf * boost
+                    if score > token_scores.get(tool_id, 0.0):
+                        token_scores[tool_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {tool_id: scores[tool_id] + score for tool_id, score in token_scores.items()}
+            if not scores:
+                return []
+        if scores is None:
+            scores = {tool_id: 0.0 for tool_id in self.docs}
+        matches = [
+            tool_id for tool_id in scores
+            if (not category or self.docs[tool_id]["category"] == category)
+            and (not pricing_type or pricing_type in self.docs[tool_id]["pricing_types"])
         ]
-    if pricing_type:
-        filter_dict["pricing"] = {"$regex": pricing_type, "$options": "i"}
-    
-    tools = await db.saas_tools.find(filter_dict).sort("rating", -1).skip(skip).limit(limit).to_list(length=limit)
-    return [SaaSTool(**tool) for tool in tools]
+        return heapq.nlargest(limit, matches, key=lambda tool_id: (scores[tool_id], self.docs[tool_id]["rating"]))
 
-@api_router.get("/blog", response_model=List[BlogPost])
-async def get_blog_posts(limit: int = Query(10, le=50), skip: int = 0):
-    """Get blog posts"""
-    posts = await db.blog_posts.find().sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit)
-    return [BlogPost(**post) for post in posts]
+    async def refresh(self, collection):
+        """Index tools changed since the last refresh, or everything on first run"""
+        query = {"updated_at": {"$gte": self.last_updated}} if self.last_updated else {}
+        started_at = datetime.utcnow()
+        changed = 0
+        async for tool in collection.find(query, self.PROJECTION):
+            self.add(tool)
+            changed += 1
+        self.last_updated = started_at
+        self.ready = True
+        return changed
 
-# CRITICAL: Specific endpoints BEFORE generic slug endpoint
-@api_router.post("/blog/bulk-generate")
-async def bulk_generate_blog_posts():
-    """Generate multiple blog posts for initial content"""
-    
-    blog_topics = [
-        {"title": "Best CRM Software for Small Business 2025", "category": "Sales"},
-        {"title": "Top Project Management Tools That Actually Work", "category": "Productivity"},
-        {"title": "Email Marketing Platforms: Complete ROI Analysis", "category": "Marketing"},
-        {"title": "Analytics Tools Every Business Needs in 2025", "category": "Analytics"},
-        {"title": "Design Software for Non-Designers: Complete Guide", "category": "Design"},
-        {"title": "Customer Support Software That Reduces Churn", "category": "Support"},
-        {"title": "Accounting Software for Growing SaaS Companies", "category": "Finance"},
-        {"title": "HR Management Tools: Streamline Your People Operations", "category": "HR"},
-        {"title": "Social Media Management: Tools That Generate ROI", "category": "Marketing"},
-        {"title": "E-commerce Platforms: Which One Maximizes Revenue?", "category": "E-commerce"},
-        {"title": "Video Conferencing Solutions: Performance vs Price", "category": "Communication"},
-        {"title": "Password Management: Security Tools Your Team Needs", "category": "Security"},
-        {"title": "Backup Solutions: Protect Your Business Data", "category": "Security"},
-        {"title": "Lead Generation Tools That Actually Work in 2025", "category": "Marketing"},
-        {"title": "Automation Tools: Reduce Manual Work, Increase Profits", "category": "Productivity"},
-        {"title": "Customer Feedback Tools: Turn Opinions into Revenue", "category": "Support"},
-        {"title": "Invoicing Software: Get Paid Faster, Work Less", "category": "Finance"},
-        {"title": "Team Collaboration Tools for Remote-First Companies", "category": "Productivity"},
-        {"title": "SEO Tools That Deliver Measurable Traffic Growth", "category": "Marketing"},
-        {"title": "Live Chat Software: Convert Visitors to Customers", "category": "Support"}
-    ]
-    
-    created_posts = []
-    
-    for topic in blog_topics:
+tool_search_index = ToolSearchIndex()
+
+async def wait_for_wakeup(event: asyncio.Event, timeout: float):
+    """Sleep until event is set or timeout passes; unlike wait_for(event.wait()), never swallows a cancellation"""
+    waiter = asyncio.ensure_future(event.wait())
+    try:
+        await asyncio.wait({waiter}, timeout=timeout)
+    finally:
+        waiter.cancel()
+
+# Set when another worker reports a catalog change, so this worker's index catches up right away
+tool_search_wakeup = asyncio.Event()
+
+async def refresh_tool_search_index_periodically():
+    while True:
+        tool_search_wakeup.clear()
         try:
-            # Check if post already exists
-            existing_post = await db.blog_posts.find_one({"title": topic["title"]})
-            if existing_post:
-                continue
-            
-            # Generate slug
-            slug = slugify(topic["title"])
-            existing_slug = await db.blog_posts.find_one({"slug": slug})
-            if existing_slug:
-                slug = f"{slug}-{str(uuid.uuid4())[:8]}"
-            
-            # Generate AI content
-            ai_content = await generate_ai_content(topic["title"], topic["category"], ["saas", "tools", "business"])
-            
-            # Create blog post
-            blog_post = BlogPost(
-                title=topic["title"],
-                slug=slug,
-                content=ai_content["content"],
-                excerpt=ai_content["excerpt"],
-                category=topic["category"],
-                tags=["saas", "tools", "business", "productivity"],
-                featured_image="https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&h=400&fit=crop",
-                meta_title=topic["title"],
-                meta_description=ai_content["meta_description"],
-                affiliate_links=ai_content["affiliate_links"],
-                featured=len(created_posts) < 5  # First 5 posts are featured
-            )
-            
-            await db.blog_posts.insert_one(blog_post.dict())
-            created_posts.append(blog_post)
-            
-            # Small delay to avoid overwhelming the system
-            await asyncio.sleep(0.1)
-            
+            if await tool_search_index.refresh(db.saas_tools):
+                response_cache.invalidate_prefix("tools:")
         except Exception as e:
-            logging.error(f"Error creating post '{topic['title']}': {e}")
-            continue
-    
-    return {
-        "message": f"Successfully generated {len(created_posts)} blog posts with affiliate links!",
-        "posts": [{"title": post.title, "slug": post.slug, "category": post.category} for post in created_posts]
-    }
+            logging.error(f"Error refreshing tool search index: {e}")
+        await wait_for_wakeup(tool_search_wakeup, TOOL_SEARCH_REFRESH_SECONDS)
 
-@api_router.post("/blog/update-content")
-async def update_existing_content(count: int = 20):
-    """Update existing blog posts with enhanced content"""
-    try:
-        # Get existing posts
-        existing_posts = await db.blog_posts.find().limit(count).to_list(length=count)
-        updated_count = 0
-        
-        for post in existing_posts:
-            try:
-                # Generate new enhanced content
-                ai_content = await generate_ai_content(post["title"], post["category"], post.get("tags", []))
-                
-                # Update the post
-                await db.blog_posts.update_one(
-                    {"_id": post["_id"]},
-                    {"$set": {
-                        "content": ai_content["content"],
-                        "excerpt": ai_content["excerpt"],
-                        "meta_description": ai_content["meta_description"],
-                        "affiliate_links": ai_content["affiliate_links"],
-                        "updated_at": datetime.utcnow()
-                    }}
-                )
-                updated_count += 1
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                logging.error(f"Error updating post '{post['title']}': {e}")
-                continue
-        
-        return {
-            "message": f"Successfully updated {updated_count} blog posts",
-            "updated_count": updated_count
-        }
-        
-    except Exception as e:
-        logging.error(f"Error updating content: {e}")
-        return {"error": str(e)}
+# Related posts and tools
+RECOMMENDATION_REFRESH_SECONDS = int(os.environ.get('RECOMMENDATION_REFRESH_SECONDS', 300))
 
-@api_router.get("/stats")
-async def get_stats():
-    """Get platform statistics"""
-    try:
-        total_posts = await db.blog_posts.count_documents({})
-        published_posts = await db.blog_posts.count_documents({"published": True})
-        featured_posts = await db.blog_posts.count_documents({"featured": True})
-        
-        return {
-            "total_posts": total_posts,
-            "published_posts": published_posts,
-            "featured_posts": featured_posts,
-            "ai_enabled": AI_ENABLED
-        }
-    except Exception as e:
-        logging.error(f"Error getting stats: {e}")
-        return {"error": str(e)}
+def post_terms(post: Dict[str, Any]) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for text, weight in [(post.get("title", ""), 1.0), (post.get("category", ""), 1.0), *[(tag, 2.0) for tag in post.get("tags") or []]]:
+        for token in tokenize(text):
+            weights[token] = weights.get(token, 0.0) + weight
+    return weights
 
-@api_router.post("/newsletter/subscribe")
-async def subscribe_newsletter(email: str, name: Optional[str] = None):
-    """Subscribe to newsletter"""
-    try:
-        existing_sub = await db.newsletter_subscriptions.find_one({"email": email})
-        if existing_sub:
-            return {"message": "Already subscribed to newsletter"}
+def tool_terms(tool: Dict[str, Any]) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for text, weight in [(tool.get("name", ""), 1.0), (tool.get("category", ""), 1.0), *[(feature, 2.0) for feature in tool.get("features") or []]]:
+        for token in tokenize(text):
+            weights[token] = weights.get(token, 0.0) + weight
+    return weights
+
+class RecommendationIndex:
+    """TF-IDF vectors over a shared term space, scored against a query with NumPy; posts and tools get one each"""
+
+    def __init__(self, collection_name: str, key_field: str, projection: Dict[str, int], query: Dict[str, Any], terms_fn):
+        self.collection_name = collection_name
+        self.key_field = key_field
+        self.projection = {**projection, "_id": 0, key_field: 1, "updated_at": 1}
+        self.query = query
+        self.terms_fn = terms_fn
+        self.keys: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.terms: Dict[str, Dict[str, float]] = {}
+        self.summaries: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.posting_arrays: Dict[str, tuple] = {}
+        self.norms = np.zeros(0, dtype=np.float64)
+        self.live = 0
+        self.last_updated: Optional[datetime] = None
+        self.ready = False
+
+    def idf(self, term: str) -> float:
+        return math.log((1 + self.live) / (1 + len(self.postings.get(term, ())))) + 1.0
+
+    def term_arrays(self, term: str) -> tuple:
+        """Posting rows and weights as arrays, rebuilt lazily after a term's postings change"""
+        arrays = self.posting_arrays.get(term)
+        if arrays is None:
+            posting = self.postings[term]
+            arrays = self.posting_arrays[term] = (
+                np.fromiter(posting.keys(), dtype=np.int64, count=len(posting)),
+                np.fromiter(posting.values(), dtype=np.float32, count=len(posting))
+            )
+        return arrays
+
+    def remove(self, key: str):
+        row = self.rows.get(key)
+        if row is None or key not in self.terms:
+            return
+        for term in self.terms.pop(key):
+            posting = self.postings[term]
+            posting.pop(row, None)
+            self.posting_arrays.pop(term, None)
+            if not posting:
+                del self.postings[term]
+        self.summaries.pop(key, None)
+        # The row is kept for reuse; an infinite norm scores it zero
+        self.norms[row] = np.inf
+        self.live -= 1
+
+    def add(self, doc: Dict[str, Any]):
+        key = doc.get(self.key_field)
+        if not key:
+            return
+        self.remove(key)
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = len(self.keys)
+            self.keys.append(key)
+            if row >= len(self.norms):
+                self.norms = np.concatenate([self.norms, np.full(max(64, len(self.norms)), np.inf)])
+        terms = self.vectorize(doc)
+        self.terms[key] = terms
+        self.summaries[key] = {field: doc.get(field) for field in self.projection if field not in ("_id", "updated_at")}
+        for term, weight in terms.items():
+            self.postings.setdefault(term, {})[row] = weight
+            self.posting_arrays.pop(term, None)
+        self.live += 1
+
+    def recompute_norms(self):
+        """Every add or remove shifts IDF, so norms are recomputed against the final IDF once a batch is applied"""
+        if not self.postings:
+            self.norms[:] = np.inf
+            return
+        rows, squares = [], []
+        for term in self.postings:
+            term_rows, term_weights = self.term_arrays(term)
+            rows.append(term_rows)
+            squares.append((term_weights.astype(np.float64) * self.idf(term)) ** 2)
+        norms = np.sqrt(np.bincount(np.concatenate(rows), weights=np.concatenate(squares), minlength=len(self.norms)))
+        # Removed documents keep their row but no postings; an infinite norm scores them zero
+        norms[norms == 0] = np.inf
+        self.norms = norms
+
+    def vectorize(self, doc: Dict[str, Any]) -> Dict[str, float]:
+        # Sublinear term frequency so a tag repeated in the title doesn't dominate
+        return {term: 1.0 + math.log(weight) if weight >= 1 else weight for term, weight in self.terms_fn(doc).items()}
+
+    def similar(self, terms: Dict[str, float], limit: int, exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Cosine similarity of a term vector against every indexed document"""
+        query = {term: weight * self.idf(term) for term, weight in terms.items() if term in self.postings}
+        query_norm = math.sqrt(sum(weight ** 2 for weight in query.values()))
+        if not query_norm or not self.keys:
+            return []
+        rows, weights = [], []
+        for term, query_weight in query.items():
+            term_rows, term_weights = self.term_arrays(term)
+            rows.append(term_rows)
+            weights.append(term_weights * (query_weight * self.idf(term)))
+        scores = np.bincount(np.concatenate(rows), weights=np.concatenate(weights), minlength=len(self.keys))
+        scores = scores / (self.norms[:len(self.keys)] * query_norm)
+        # Cosines are at most 1; clip floating point overshoot on identical vectors
+        np.minimum(scores, 1.0, out=scores)
+        if exclude in self.rows:
+            scores[self.rows[exclude]] = 0.0
+        count = min(limit, int(np.count_nonzero(scores > 0)))
+        if not count:
+            return []
+        top = np.argpartition(-scores, count - 1)[:count]
+        top = top[np.argsort(-scores[top])]
+        return [{**self.summaries[self.keys[row]], "score": round(float(scores[row]), 4)} for row in top]
+
+    async def refresh(self, collection):
+        """Re-vectorize documents changed since the last refresh, then recompute norms under the new IDF"""
+        query = {"updated_at": {"$gte": self.last_updated}} if self.last_updated else {}
+        started_at = datetime.utcnow()
+        changed = await collection.find(query, {**self.projection, **{field: 1 for field in self.query}}).to_list(length=None)
+        # Applied without awaiting, so lookups never see postings and norms out of step
+        for doc in changed:
+            if all(doc.get(field) == value for field, value in self.query.items()):
+                self.add(doc)
+            else:
+                self.remove(doc.get(self.key_field))
+        if changed:
+            self.recompute_norms()
+        self.last_updated = started_at
+        self.ready = True
+        return len(changed)
+
+related_posts_index = RecommendationIndex(
+    "blog_posts", "slug", {"title": 1, "category": 1, "tags": 1, "excerpt": 1, "featured_image": 1}, {"published": True}, post_terms
+)
+related_tools_index = RecommendationIndex(
+    "saas_tools", "id", {"name": 1, "category": 1, "features": 1, "rating": 1, "logo_url": 1, "affiliate_link": 1}, {}, tool_terms
+)
+
+async def refresh_recommendation_indexes():
+    for index in (related_posts_index, related_tools_index):
+        try:
+            await index.refresh(db[index.collection_name])
+        except Exception as e:
+            logging.error(f"Error refreshing {index.collection_name} recommendations: {e}")
+
+# Writers set this instead of refreshing inline, so a slow or failing refresh never touches their request
+recommendation_wakeup = asyncio.Event()
+
+async def refresh_recommendation_indexes_periodically():
+    while True:
+        recommendation_wakeup.clear()
+        await refresh_recommendation_indexes()
+        await wait_for_wakeup(recommendation_wakeup, RECOMMENDATION_REFRESH_SECONDS)
+
+# Buffered view counts
+VIEW_COUNT_MODE = os.environ.get('VIEW_COUNT_MODE', 'buffered')
+VIEW_FLUSH_SECONDS = float(os.environ.get('VIEW_FLUSH_SECONDS', 5))
+
+class ViewCounter:
+    """Coalesces post views in memory and writes them as one bulk_write of $inc ops"""
+
+    def __init__(self):
+        self.pending: Dict[str, int] = {}
+
+    def increment(self, slug: str):
+        self.pending[slug] = self.pending.get(slug, 0) + 1
+
+    async def flush(self, collection):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        written = False
+        try:
+            await collection.bulk_write(
+                [UpdateOne({"slug": slug}, {"$inc": {"views": views}}) for slug, views in pending.items()],
+                ordered=False
+            )
+            written = True
+        except Exception as e:
+            logging.error(f"Error flushing {len(pending)} view counts: {e}")
+        finally:
+            if not written:
+                # Keep the counts for the next flush rather than dropping them, including when shutdown cancels this one
+                for slug, views in pending.items():
+                    self.pending[slug] = self.pending.get(slug, 0) + views
+
+view_counter = ViewCounter()
+
+async def flush_view_counts_periodically():
+    while True:
+        await asyncio.sleep(VIEW_FLUSH_SECONDS)
+        await view_counter.flush(db.blog_posts)
+
+# Response cache
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1000))
+CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', 60))
+VALIDATE_READ_RESPONSES = os.environ.get('VALIDATE_READ_RESPONSES', '').lower() in ('1', 'true', 'yes')
+STATS_CACHE_SECONDS = float(os.environ.get('STATS_CACHE_SECONDS', 15))
+CACHE_SYNC_SECONDS = float(os.environ.get('CACHE_SYNC_SECONDS', 2))
+
+class ResponseCache:
+    """Bounded LRU/TTL cache of serialized response bodies with single-flight loading"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_load(self, key: str, loader, ttl: Optional[float] = None) -> Any:
+        entry = self.entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        if key in self.inflight:
+            # Another request is already fetching this key; share its result
+            self.coalesced += 1
+            return await asyncio.shield(self.inflight[key])
+        
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        generation = self.generation
+        try:
+            body = await loader()
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so unshared failures aren't logged as unhandled
+            raise
+        finally:
+            del self.inflight[key]
+        # Skip storing if an invalidation ran while we were loading
+        if generation == self.generation:
+            self.entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), body)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        future.set_result(body)
+        return body
+
+    def invalidate(self, *keys: str):
+        self.generation += 1
+        for key in keys:
+            self.entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str):
+        self.generation += 1
+        for key in [key for key in self.entries if key.startswith(prefix)]:
+            del self.entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+response_cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def serialize_response(result: Any) -> bytes:
+    """Encode documents or models straight to JSON bytes with orjson"""
+    return orjson.dumps(result, default=json_default)
+
+def read_models(model, docs: List[Dict[str, Any]]) -> List[Any]:
+    """Trusted, projected DB documents are served as-is unless VALIDATE_READ_RESPONSES is set"""
+    if VALIDATE_READ_RESPONSES:
+        return [model(**doc) for doc in docs]
+    return docs
+
+def cached_response(prefix: str):
+    """Serve an endpoint from response_cache, keyed by prefix and its normalized arguments"""
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            params = {
+                name: value.strip().lower() if name == "search" and isinstance(value, str) else value
+                for name, value in kwargs.items() if value is not None
+            }
+            key = f"{prefix}:{json.dumps(params, sort_keys=True, default=str)}"
+
+            async def load() -> bytes:
+                return serialize_response(await endpoint(**kwargs))
+            body = await response_cache.get_or_load(key, load)
+            return Response(content=body, media_type="application/json")
+        return wrapper
+    return decorator
+
+def apply_blog_invalidation(slugs: List[str]):
+    response_cache.invalidate("stats", *[f"blog:{slug}" for slug in slugs if slug])
+    response_cache.invalidate_prefix("blog-list:")
+
+def rewind_tool_indexes(since: datetime):
+    """Make the next refreshes re-read tools changed since a write began, even if a refresh ran while it was writing"""
+    for index in (tool_search_index, related_tools_index):
+        if index.last_updated and index.last_updated > since:
+            index.last_updated = since
+
+def apply_remote_invalidation(entry: Dict[str, Any]):
+    # Entries published before kinds existed are all blog invalidations
+    if entry.get("kind", "blog") == "tools":
+        response_cache.invalidate_prefix("tools:")
+        if entry.get("since"):
+            rewind_tool_indexes(entry["since"])
+        tool_search_wakeup.set()
+    else:
+        apply_blog_invalidation(entry.get("slugs", []))
+    recommendation_wakeup.set()
+
+async def publish_invalidation(kind: str, slugs: Iterable[str] = (), since: Optional[datetime] = None):
+    """Tell the other workers to drop the same cached responses"""
+    if WEB_CONCURRENCY > 1:
+        try:
+            await db.cache_invalidations.insert_one({
+                "kind": kind,
+                "slugs": [slug for slug in slugs if slug],
+                "since": since,
+                "worker_id": WORKER_ID,
+                "created_at": datetime.utcnow()
+            })
+        except Exception as e:
+            logging.error(f"Error publishing cache invalidation: {e}")
+
+async def invalidate_blog_posts(*slugs: str):
+    """Drop cached listings and the given post pages after blog writes, on every worker"""
+    apply_blog_invalidation(list(slugs))
+    recommendation_wakeup.set()
+    await publish_invalidation("blog", slugs)
+
+async def invalidate_tools(since: Optional[datetime] = None):
+    """Drop cached tool listings after catalog writes, on every worker; since rewinds the tool indexes to the write's start"""
+    response_cache.invalidate_prefix("tools:")
+    if since:
+        rewind_tool_indexes(since)
+    recommendation_wakeup.set()
+    await publish_invalidation("tools", since=since)
+
+async def sync_cache_invalidations_periodically():
+    """Apply invalidations published by other workers; the window overlaps since reapplying is harmless"""
+    since = datetime.utcnow()
+    while True:
+        await asyncio.sleep(CACHE_SYNC_SECONDS)
+        polled_at = datetime.utcnow()
+        try:
+            query = {"created_at": {"$gte": since - timedelta(seconds=CACHE_SYNC_SECONDS)}, "worker_id": {"$ne": WORKER_ID}}
+            async for entry in db.cache_invalidations.find(query, {"_id": 0, "kind": 1, "slugs": 1, "since": 1}):
+                apply_remote_invalidation(entry)
+            since = polled_at
+        except Exception as e:
+            logging.error(f"Error syncing cache invalidations: {e}")
+
+# Per-client rate limiting and request coalescing
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+RATE_LIMIT_MAX_CLIENTS = int(os.environ.get('RATE_LIMIT_MAX_CLIENTS', 10000))
+# Proxies in front of the app that append to X-Forwarded-For (Railway's edge is one). Only hops they
+# appended are trusted; anything further left came from the client and can be forged. 0 uses the socket peer.
+RATE_LIMIT_TRUSTED_PROXY_HOPS = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXY_HOPS', 1))
+RATE_LIMIT_API_KEY_HEADER = os.environ.get('RATE_LIMIT_API_KEY_HEADER', 'x-api-key').lower()
+# Only keys listed here get their own budget; unknown keys are ignored rather than trusted
+RATE_LIMIT_API_KEYS = frozenset(key.strip() for key in os.environ.get('RATE_LIMIT_API_KEYS', '').split(',') if key.strip())
+
+# (name, method, path, required query parameter, "requests/seconds" or "off")
+RATE_LIMIT_RULES = [
+    ("generate", "POST", re.compile(r"^/api/blog/(bulk-generate|update-content)$"), None, os.environ.get('RATE_LIMIT_GENERATE', '2/60')),
+    ("create", "POST", re.compile(r"^/api/blog$"), None, os.environ.get('RATE_LIMIT_CREATE', '10/60')),
+    ("import", "POST", re.compile(r"^/api/(tools|newsletter)/import$"), None, os.environ.get('RATE_LIMIT_IMPORT', '5/60')),
+    ("search", "GET", re.compile(r"^/api/tools$"), "search", os.environ.get('RATE_LIMIT_SEARCH', '20/1')),
+]
+
+def parse_rate_limit(spec: str) -> Optional[Tuple[float, int]]:
+    """Turn "requests/seconds" into this worker's (rate, capacity) share, or None when disabled"""
+    if not spec or spec.strip().lower() == "off":
+        return None
+    requests, seconds = spec.split("/")
+    capacity = max(1, int(requests) // WEB_CONCURRENCY)
+    return int(requests) / float(seconds) / WEB_CONCURRENCY, capacity
+
+class InMemoryRateLimitBackend:
+    """Token buckets per client key in this worker, forgetting the least recently seen clients first"""
+
+    def __init__(self, max_clients: int):
+        self.max_clients = max_clients
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(rate, capacity)
+            while len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        return bucket.try_acquire()
+
+    def size(self) -> int:
+        return len(self.buckets)
+
+class RateLimiter:
+    """Matches requests against RATE_LIMIT_RULES; any backend with async take(key, rate, capacity) -> retry_after and size() plugs in"""
+
+    def __init__(self, rules, backend):
+        self.rules = [(name, method, path, param, parse_rate_limit(spec)) for name, method, path, param, spec in rules]
+        self.backend = backend
+
+    def match(self, method: str, path: str, query: Dict[str, str]) -> Optional[tuple]:
+        for name, rule_method, rule_path, param, limit in self.rules:
+            if limit and method == rule_method and rule_path.match(path) and (param is None or query.get(param)):
+                return name, limit
+        return None
+
+    async def check(self, rule: str, client_key: str, limit: Tuple[float, int]) -> float:
+        retry_after = await self.backend.take(f"{rule}:{client_key}", *limit)
+        metrics.inc("rate_limit_decisions_total", {"rule": rule, "outcome": "limited" if retry_after else "allowed"})
+        metrics.set("rate_limit_clients", value=self.backend.size())
+        return retry_after
+
+rate_limiter = RateLimiter(RATE_LIMIT_RULES, InMemoryRateLimitBackend(RATE_LIMIT_MAX_CLIENTS))
+
+def rate_limit_client_key(scope) -> str:
+    """Identify the caller by a known API key, otherwise by the address our trusted proxy saw"""
+    headers = Headers(scope=scope)
+    api_key = headers.get(RATE_LIMIT_API_KEY_HEADER)
+    if api_key and api_key in RATE_LIMIT_API_KEYS:
+        return "key:" + hashlib.blake2b(api_key.encode(), digest_size=8).hexdigest()
+    if RATE_LIMIT_TRUSTED_PROXY_HOPS:
+        hops = [hop.strip() for hop in headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+        if len(hops) >= RATE_LIMIT_TRUSTED_PROXY_HOPS:
+            return "ip:" + hops[-RATE_LIMIT_TRUSTED_PROXY_HOPS]
+    client_address = scope.get("client")
+    return "ip:" + (client_address[0] if client_address else "unknown")
+
+class SingleFlight:
+    """Shares one execution among identical concurrent calls; the work runs as a task so a disconnecting caller can't cancel it for the rest"""
+
+    def __init__(self):
+        self.inflight: Dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, fn):
+        task = self.inflight.get(key)
+        if task is not None:
+            metrics.inc("coalesced_requests_total", {"operation": key.split(":", 1)[0]})
+        else:
+            task = self.inflight[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+request_coalescer = SingleFlight()
+
+# Cursor pagination
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload, default=str).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, parse_key=None) -> Dict[str, Any]:
+    """Decode and validate an opaque cursor, converting the keyset value with parse_key; empty requests the first page"""
+    if not cursor:
+        return {}
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(position, dict):
+            raise ValueError("cursor is not an object")
+        if "k" in position:
+            if not isinstance(position["k"], list):
+                raise ValueError("cursor key is not a list")
+            value, last_id = position["k"]
+            if not isinstance(last_id, str):
+                raise ValueError("cursor id is not a string")
+            position["k"] = [parse_key(value) if parse_key else value, last_id]
+        if "o" in position and (type(position["o"]) is not int or position["o"] < 0):
+            raise ValueError("cursor offset is not a non-negative integer")
+        return position
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_after(field: str, value: Any, last_id: str) -> Dict[str, Any]:
+    """Match documents after (value, last_id) in a (field desc, id desc) ordering"""
+    return {"$or": [{field: {"$lt": value}}, {field: value, "id": {"$lt": last_id}}]}
+
+def next_keyset_cursor(docs: List[Dict[str, Any]], field: str, limit: int) -> Optional[str]:
+    if len(docs) < limit:
+        return None
+    return encode_cursor({"k": [docs[-1][field], docs[-1]["id"]]})
+
+# Index management
+INDEX_CHECK_ON_STARTUP = os.environ.get('INDEX_CHECK_ON_STARTUP', '').lower() in ('1', 'true', 'yes')
+
+INDEX_REGISTRY = {
+    "blog_posts": [
+        IndexModel([("slug", 1)], unique=True, name="slug_unique"),
+        IndexModel([("title", 1)], unique=True, name="title_unique"),
+        IndexModel([("id", 1)], unique=True, name="id_unique"),
+        IndexModel([("created_at", -1), ("id", -1)], name="created_at_id"),
+        IndexModel([("updated_at", 1)], name="updated_at"),
+        IndexModel([("category", 1), ("updated_at", 1)], name="category_updated_at"),
+    ],
+    "saas_tools": [
+        IndexModel([("id", 1)], unique=True, name="id_unique"),
+        IndexModel([("name_key", 1)], unique=True, sparse=True, name="name_key_unique"),
+        IndexModel([("rating", -1), ("id", -1)], name="rating_id"),
+        IndexModel([("category", 1), ("rating", -1), ("id", -1)], name="category_rating_id"),
+        IndexModel([("updated_at", 1)], name="updated_at"),
+    ],
+    "newsletter_subscriptions": [
+        IndexModel([("email", 1)], unique=True, name="email_unique"),
+    ],
+    "generation_cache": [
+        IndexModel([("key", 1)], unique=True, name="key_unique"),
+        IndexModel([("last_used_at", 1)], name="last_used_at"),
+    ],
+    "jobs": [
+        IndexModel([("id", 1)], unique=True, name="id_unique"),
+        IndexModel([("idempotency_key", 1)], unique=True, sparse=True, name="idempotency_key_unique"),
+        IndexModel([("fingerprint", 1), ("status", 1)], name="fingerprint_status"),
+        IndexModel([("status", 1), ("created_at", 1)], name="status_created_at"),
+    ],
+    "job_items": [
+        IndexModel([("job_id", 1), ("index", 1)], unique=True, name="job_id_index_unique"),
+    ],
+    "cache_invalidations": [
+        IndexModel([("created_at", 1)], expireAfterSeconds=300, name="created_at_ttl"),
+    ],
+}
+
+# Representative filter/sort shapes for every indexed query the app issues
+QUERY_SHAPES = [
+    ("blog_posts", {"slug": "example"}, None),
+    ("blog_posts", {"id": "example"}, None),
+    ("blog_posts", {"$or": [{"title": {"$in": ["example"]}}, {"slug": {"$in": ["example"]}}]}, None),
+    ("blog_posts", {}, [("created_at", -1), ("id", -1)]),
+    ("blog_posts", keyset_after("created_at", datetime(2025, 1, 1), "example"), [("created_at", -1), ("id", -1)]),
+    ("blog_posts", {"updated_at": {"$lt": datetime(2025, 1, 1)}}, [("updated_at", 1)]),
+    ("blog_posts", {"updated_at": {"$lt": datetime(2025, 1, 1)}, "category": "Marketing"}, [("updated_at", 1)]),
+    ("saas_tools", {"id": {"$in": ["example"]}}, None),
+    ("saas_tools", {"name_key": "example"}, None),
+    ("saas_tools", {}, [("rating", -1), ("id", -1)]),
+    ("saas_tools", {"category": "Marketing"}, [("rating", -1), ("id", -1)]),
+    ("saas_tools", keyset_after("rating", 4.5, "example"), [("rating", -1), ("id", -1)]),
+    ("saas_tools", {"updated_at": {"$gte": datetime(2025, 1, 1)}}, None),
+    ("newsletter_subscriptions", {"email": "reader@example.com"}, None),
+    ("generation_cache", {"key": "example"}, None),
+    ("generation_cache", {}, [("last_used_at", 1)]),
+    ("jobs", {"id": "example"}, None),
+    ("jobs", {"idempotency_key": "example"}, None),
+    ("jobs", {"fingerprint": "example", "status": {"$in": ["queued", "running"]}}, None),
+    ("jobs", {"$or": [{"status": "queued"}, {"status": "running", "lease_expires_at": {"$lt": datetime(2025, 1, 1)}}]},
+     [("created_at", 1)]),
+    ("job_items", {"job_id": "example", "status": "pending"}, [("index", 1)]),
+]
+
+# Handlers rely on these for correctness, so the app must not start without them
+REQUIRED_INDEXES = {"email_unique"}
+
+async def apply_index_registry():
+    """Create every registered index; failures are logged, except for required indexes, which abort startup"""
+    for collection, indexes in INDEX_REGISTRY.items():
+        for index in indexes:
+            try:
+                await db[collection].create_indexes([index])
+            except Exception as e:
+                if index.document["name"] in REQUIRED_INDEXES:
+                    raise RuntimeError(f"Required index {index.document['name']} on {collection} could not be created: {e}") from e
+                logging.error(f"Error creating index {index.document['name']} on {collection}: {e}")
+
+def plan_stages(plan: Any) -> List[str]:
+    """Collect every stage name in an explain() plan tree"""
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in plan_stages(item)]
+    if not isinstance(plan, dict):
+        return []
+    stages = [plan["stage"]] if "stage" in plan else []
+    for value in plan.values():
+        if isinstance(value, (dict, list)):
+            stages.extend(plan_stages(value))
+    return stages
+
+async def check_query_plans() -> List[Dict[str, Any]]:
+    """Explain each registered query shape and report the ones that fall back to COLLSCAN"""
+    report = []
+    for collection, query, sort in QUERY_SHAPES:
+        command = {"find": collection, "filter": query}
+        if sort:
+            command["sort"] = dict(sort)
+        explain = await db.command("explain", command, verbosity="queryPlanner")
+        stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+        report.append({
+            "collection": collection,
+            "filter": query,
+            "sort": command.get("sort"),
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages
+        })
+    return report
+
+# API Endpoints - FIXED ROUTING ORDER
+@api_router.get("/")
+async def root():
+    return {"message": "SaaS Tools Digital API", "status": "operational", "ai_enabled": AI_ENABLED}
+
+@api_router.get("/health")
+async def health_check():
+    return {"status": "healthy", "service": "SaaS Tools Digital API", "worker": WORKER_ID}
+
+@api_router.get("/tools", response_model=Union[List[SaaSTool], SaaSToolPage])
+@cached_response("tools")
+async def get_tools(
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    pricing_type: Optional[str] = None,
+    limit: int = Query(20, le=100),
+    skip: int = 0,
+    cursor: Optional[str] = None
+):
+    """Get SaaS tools with optional filtering; pass cursor (empty for the first page) for keyset pagination"""
+    position = decode_cursor(cursor, parse_key=float) if cursor is not None else {}
+    normalized_pricing = pricing_type.strip().lower().replace(" ", "-") if pricing_type else None
+    if (search or pricing_type) and tool_search_index.ready and (not pricing_type or normalized_pricing in PRICING_TYPES):
+        # Ranked results live in memory, so an offset is cheap to resume from
+        offset = position.get("o", 0) if cursor is not None else skip
+        tool_ids = tool_search_index.search(search, category, normalized_pricing, offset + limit)[offset:]
+        tools = await db.saas_tools.find({"id": {"$in": tool_ids}}, SAAS_TOOL_PROJECTION).to_list(length=len(tool_ids))
+        tools_by_id = {tool["id"]: tool for tool in tools}
+        result = read_models(SaaSTool, [tools_by_id[tool_id] for tool_id in tool_ids if tool_id in tools_by_id])
+        if cursor is None:
+            return result
+        next_cursor = encode_cursor({"o": offset + limit}) if len(tool_ids) == limit else None
+        return {"items": result, "next_cursor": next_cursor}
+
+    # Fallback while the index is warming up; escape input so it can't inject patterns
+    filter_dict = {}
+    if category:
+        filter_dict["category"] = category
+    if search:
+        pattern = re.escape(search)
+        filter_dict["$or"] = [
+            {"name": {"$regex": pattern, "$options": "i"}},
+            {"description": {"$regex": pattern, "$options": "i"}}
+        ]
+    if pricing_type:
+        filter_dict["pricing"] = {"$regex": re.escape(pricing_type), "$options": "i"}
+    if position.get("k"):
+        filter_dict = {"$and": [filter_dict, keyset_after("rating", *position["k"])]}
+    
+    query = db.saas_tools.find(filter_dict, SAAS_TOOL_PROJECTION).sort([("rating", -1), ("id", -1)])
+    if cursor is None:
+        query = query.skip(skip)
+    tools = await query.limit(limit).to_list(length=limit)
+    if cursor is None:
+        return read_models(SaaSTool, tools)
+    return {"items": read_models(SaaSTool, tools), "next_cursor": next_keyset_cursor(tools, "rating", limit)}
+
+@api_router.get("/blog", response_model=Union[List[BlogPostSummary], BlogPostSummaryPage])
+@cached_response("blog-list")
+async def get_blog_posts(
+    limit: int = Query(10, le=50),
+    skip: int = 0,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None
+):
+    """Get blog post summaries; full content is only served by /api/blog/{slug}"""
+    projection = BLOG_SUMMARY_PROJECTION
+    selected = None
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in BlogPost.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        # Cursor paging needs the sort keys even when the caller didn't select them
+        projection = {"_id": 0, "id": 1, "created_at": 1, **{field: 1 for field in selected}}
+    
+    query = {}
+    position = decode_cursor(cursor, parse_key=datetime.fromisoformat) if cursor is not None else {}
+    if position.get("k"):
+        query = keyset_after("created_at", *position["k"])
+    
+    posts = db.blog_posts.find(query, projection).sort([("created_at", -1), ("id", -1)])
+    if cursor is None:
+        posts = posts.skip(skip)
+    posts = await posts.limit(limit).to_list(length=limit)
+    next_cursor = next_keyset_cursor(posts, "created_at", limit) if cursor is not None else None
+    
+    if selected:
+        items = [{field: post[field] for field in selected if field in post} for post in posts]
+    else:
+        items = read_models(BlogPostSummary, posts)
+    if cursor is None:
+        return items
+    return {"items": items, "next_cursor": next_cursor}
+
+# CRITICAL: Specific endpoints BEFORE generic slug endpoint
+DEFAULT_BLOG_TOPICS = [
+    {"title": "Best CRM Software for Small Business 2025", "category": "Sales"},
+    {"title": "Top Project Management Tools That Actually Work", "category": "Productivity"},
+    {"title": "Email Marketing Platforms: Complete ROI Analysis", "category": "Marketing"},
+    {"title": "Analytics Tools Every Business Needs in 2025", "category": "Analytics"},
+    {"title": "Design Software for Non-Designers: Complete Guide", "category": "Design"},
+    {"title": "Customer Support Software That Reduces Churn", "category": "Support"},
+    {"title": "Accounting Software for Growing SaaS Companies", "category": "Finance"},
+    {"title": "HR Management Tools: Streamline Your People Operations", "category": "HR"},
+    {"title": "Social Media Management: Tools That Generate ROI", "category": "Marketing"},
+    {"title": "E-commerce Platforms: Which One Maximizes Revenue?", "category": "E-commerce"},
+    {"title": "Video Conferencing Solutions: Performance vs Price", "category": "Communication"},
+    {"title": "Password Management: Security Tools Your Team Needs", "category": "Security"},
+    {"title": "Backup Solutions: Protect Your Business Data", "category": "Security"},
+    {"title": "Lead Generation Tools That Actually Work in 2025", "category": "Marketing"},
+    {"title": "Automation Tools: Reduce Manual Work, Increase Profits", "category": "Productivity"},
+    {"title": "Customer Feedback Tools: Turn Opinions into Revenue", "category": "Support"},
+    {"title": "Invoicing Software: Get Paid Faster, Work Less", "category": "Finance"},
+    {"title": "Team Collaboration Tools for Remote-First Companies", "category": "Productivity"},
+    {"title": "SEO Tools That Deliver Measurable Traffic Growth", "category": "Marketing"},
+    {"title": "Live Chat Software: Convert Visitors to Customers", "category": "Support"}
+]
+
+def build_blog_post(topic: Dict[str, str], slug: str, ai_content: Dict[str, Any], featured: bool) -> BlogPost:
+    return BlogPost(
+        title=topic["title"],
+        slug=slug,
+        content=ai_content["content"],
+        excerpt=ai_content["excerpt"],
+        category=topic["category"],
+        tags=["saas", "tools", "business", "productivity"],
+        featured_image="https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&h=400&fit=crop",
+        meta_title=topic["title"],
+        meta_description=ai_content["meta_description"],
+        affiliate_links=ai_content["affiliate_links"],
+        featured=featured
+    )
+
+async def plan_bulk_generation(topics: List[Dict[str, str]], featured_slots: int = 5) -> tuple:
+    """Split out topics that already exist and assign unique slugs with a single lookup"""
+    slugs = [slugify(topic["title"]) for topic in topics]
+    existing = await db.blog_posts.find(
+        {"$or": [{"title": {"$in": [topic["title"] for topic in topics]}}, {"slug": {"$in": slugs}}]},
+        {"_id": 0, "title": 1, "slug": 1}
+    ).to_list(length=None)
+    existing_titles = {post.get("title") for post in existing}
+    taken_slugs = {post.get("slug") for post in existing}
+    
+    plan = []
+    skipped = []
+    for topic, slug in zip(topics, slugs):
+        if topic["title"] in existing_titles:
+            skipped.append(topic)
+            continue
+        existing_titles.add(topic["title"])
+        if slug in taken_slugs:
+            slug = f"{slug}-{str(uuid.uuid4())[:8]}"
+        taken_slugs.add(slug)
+        # First few new posts are featured
+        plan.append({"topic": topic, "slug": slug, "featured": len(plan) < featured_slots})
+    return plan, skipped
+
+async def run_bulk_generation(plan: List[Dict[str, Any]], workers: int, force_refresh: bool = False):
+    """Generate posts with a pool of workers, yielding one event per topic as it completes"""
+    pending: asyncio.Queue = asyncio.Queue()
+    for item in plan:
+        pending.put_nowait(item)
+    completed: asyncio.Queue = asyncio.Queue()
+    
+    async def worker():
+        while True:
+            try:
+                item = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            topic = item["topic"]
+            try:
+                ai_content = await generate_ai_content(topic["title"], topic["category"], ["saas", "tools", "business"], force_refresh)
+                await completed.put({"post": build_blog_post(topic, item["slug"], ai_content, item["featured"])})
+            except Exception as e:
+                logging.error(f"Error creating post '{topic['title']}': {e}")
+                await completed.put({"title": topic["title"], "error": str(e)})
+    
+    tasks = [asyncio.create_task(worker()) for _ in range(min(workers, len(plan)))]
+    try:
+        for _ in range(len(plan)):
+            yield await completed.get()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def insert_generated_posts(batch: List[BlogPost]) -> tuple:
+    """Insert a batch of generated posts, returning (stored posts, [(post, error)] for the rest)"""
+    try:
+        await db.blog_posts.insert_many([post.dict() for post in batch], ordered=False)
+        return list(batch), []
+    except BulkWriteError as e:
+        failed = {error["index"]: error.get("errmsg", "write failed") for error in e.details.get("writeErrors", [])}
+        logging.error(f"Error inserting {len(failed)} generated posts: {e}")
+        return (
+            [post for index, post in enumerate(batch) if index not in failed],
+            [(batch[index], error) for index, error in failed.items()]
+        )
+    except Exception as e:
+        logging.error(f"Error inserting generated posts: {e}")
+        return [], [(post, str(e)) for post in batch]
+
+async def save_generated_posts(batch: List[BlogPost], created_posts: List[BlogPost]):
+    """Insert a batch and yield a saved or error event for every post in it"""
+    saved, failed = await insert_generated_posts(batch)
+    created_posts.extend(saved)
+    await invalidate_blog_posts(*[post.slug for post in saved])
+    for post in saved:
+        yield {"status": "saved", "title": post.title, "slug": post.slug}
+    for post, error in failed:
+        yield {"status": "error", "title": post.title, "error": error}
+
+async def bulk_generation_events(topics: List[Dict[str, str]], workers: int, featured_slots: int = 5, force_refresh: bool = False):
+    """Run the bulk pipeline, batching inserts and yielding progress events"""
+    plan, skipped = await plan_bulk_generation(topics, featured_slots)
+    for topic in skipped:
+        yield {"status": "skipped", "title": topic["title"]}
+    batch: List[BlogPost] = []
+    created_posts: List[BlogPost] = []
+    
+    async for result in run_bulk_generation(plan, workers, force_refresh):
+        if "error" in result:
+            yield {"status": "error", "title": result["title"], "error": result["error"]}
+            continue
+        post = result["post"]
+        batch.append(post)
+        yield {"status": "generated", "title": post.title, "slug": post.slug, "category": post.category}
+        if len(batch) >= BULK_INSERT_BATCH_SIZE:
+            async for event in save_generated_posts(batch, created_posts):
+                yield event
+            batch = []
+    if batch:
+        async for event in save_generated_posts(batch, created_posts):
+            yield event
+    
+    yield {
+        "status": "done",
+        "message": f"Successfully generated {len(created_posts)} blog posts with affiliate links!",
+        "posts": [{"title": post.title, "slug": post.slug, "category": post.category} for post in created_posts]
+    }
+
+@api_router.post("/blog/bulk-generate")
+async def bulk_generate_blog_posts(
+    request: Optional[BulkGenerateRequest] = None,
+    stream: bool = False,
+    background: bool = False,
+    idempotency_key: Optional[str] = Header(None)
+):
+    """Generate multiple blog posts for initial content"""
+    request = request or BulkGenerateRequest()
+    topics = [topic.dict() for topic in request.topics] or DEFAULT_BLOG_TOPICS
+    workers = request.workers or BULK_GENERATE_WORKERS
+    
+    if background:
+        async def items():
+            for topic in topics:
+                yield JobItem(title=topic["title"], category=topic["category"])
+        params = {"workers": workers, "force_refresh": request.force_refresh}
+        return await submit_job("bulk_generate", params, items(), idempotency_key)
+    
+    if stream:
+        async def ndjson():
+            async for event in bulk_generation_events(topics, workers, force_refresh=request.force_refresh):
+                yield json.dumps(event) + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    async def generate():
+        summary = {}
+        async for event in bulk_generation_events(topics, workers, force_refresh=request.force_refresh):
+            summary = event
+        return {"message": summary["message"], "posts": summary["posts"]}
+    
+    # An identical run already in flight shares its result instead of spending tokens twice
+    key = f"bulk-generate:{json.dumps({'topics': topics, 'workers': workers, 'force_refresh': request.force_refresh}, sort_keys=True)}"
+    return await request_coalescer.run(key, generate)
+
+def server_sent_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def unique_slug(title: str) -> str:
+    """Pick a free slug for a new post, rejecting titles that already exist before any tokens are spent"""
+    slug = slugify(title)
+    existing = await db.blog_posts.find_one({"$or": [{"title": title}, {"slug": slug}]}, {"_id": 0, "title": 1})
+    if existing and existing.get("title") == title:
+        raise HTTPException(status_code=409, detail="A blog post with this title already exists")
+    if existing:
+        slug = f"{slug}-{str(uuid.uuid4())[:8]}"
+    return slug
+
+async def insert_created_post(request: BlogPostCreate, slug: str, ai_content: Optional[Dict[str, Any]]) -> BlogPost:
+    ai_content = ai_content or {"content": "", "excerpt": "", "meta_description": "", "affiliate_links": []}
+    blog_post = BlogPost(
+        title=request.title,
+        slug=slug,
+        content=ai_content["content"],
+        excerpt=ai_content["excerpt"],
+        category=request.category,
+        tags=request.tags,
+        featured_image="https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&h=400&fit=crop",
+        meta_title=request.title,
+        meta_description=ai_content["meta_description"],
+        affiliate_links=ai_content["affiliate_links"]
+    )
+    await db.blog_posts.insert_one(blog_post.dict())
+    await invalidate_blog_posts(slug)
+    return blog_post
+
+async def create_blog_post_events(request: BlogPostCreate, slug: str, force_refresh: bool):
+    """Stream the article body as it is generated, then store the post"""
+    if not request.generate_content:
+        ai_content = None
+    elif not AI_ENABLED or not openai_client:
+        ai_content = fallback_content(request.title, request.category, request.tags)
+        yield server_sent_event("chunk", {"content": ai_content["content"]})
+    else:
+        meta_task = asyncio.create_task(
+            cached_chat_completion(force_refresh, **meta_completion_request(request.title, request.category))
+        )
+        parts = []
+        try:
+            async for piece in stream_chat_completion(force_refresh, **article_completion_request(request.title, request.category)):
+                parts.append(piece)
+                yield server_sent_event("chunk", {"content": piece})
+            ai_content = ai_content_result("".join(parts), await meta_task, request.category)
+        except Exception as e:
+            logging.error(f"OpenAI API error: {e}")
+            if parts:
+                yield server_sent_event("error", {"detail": "Generation failed"})
+                return
+            # Nothing sent yet, so fall back to the template content like generate_ai_content does
+            ai_content = fallback_content(request.title, request.category, request.tags)
+            yield server_sent_event("chunk", {"content": ai_content["content"]})
+        finally:
+            meta_task.cancel()
+    
+    try:
+        blog_post = await insert_created_post(request, slug, ai_content)
+    except Exception as e:
+        logging.error(f"Error creating blog post: {e}")
+        yield server_sent_event("error", {"detail": "Could not save blog post"})
+        return
+    yield server_sent_event("done", {"id": blog_post.id, "title": blog_post.title, "slug": blog_post.slug})
+
+@api_router.post("/blog", response_model=BlogPost)
+async def create_blog_post(request: BlogPostCreate, stream: bool = False, force_refresh: bool = False):
+    """Create a blog post; stream=true sends the generated body as Server-Sent Events"""
+    try:
+        slug = await unique_slug(request.title)
+        if stream:
+            return StreamingResponse(
+                create_blog_post_events(request, slug, force_refresh),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
         
-        subscription = NewsletterSubscription(email=email, name=name)
-        await db.newsletter_subscriptions.insert_one(subscription.dict())
+        ai_content = None
+        if request.generate_content:
+            ai_content = await generate_ai_content(request.title, request.category, request.tags, force_refresh)
+        return await insert_created_post(request, slug, ai_content)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error creating blog post: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def content_update_fields(ai_content: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "content": ai_content["content"],
+        "excerpt": ai_content["excerpt"],
+        "meta_description": ai_content["meta_description"],
+        "affiliate_links": ai_content["affiliate_links"],
+        "updated_at": datetime.utcnow()
+    }
+
+REFRESH_PROJECTION = {"_id": 1, "id": 1, "title": 1, "slug": 1, "category": 1, "tags": 1}
+
+async def select_posts_for_refresh(count: int, category: Optional[str] = None, oldest_first: bool = False):
+    """Stream the lightweight fields needed to regenerate at most count posts"""
+    # Mongo reads limit(0) as no limit at all
+    if count <= 0:
+        return
+    # Refreshed posts get a newer updated_at, so this keeps the walk from meeting them again
+    query: Dict[str, Any] = {"updated_at": {"$lt": datetime.utcnow()}}
+    if category:
+        query["category"] = category
+    cursor = db.blog_posts.find(query, REFRESH_PROJECTION)
+    if oldest_first:
+        cursor = cursor.sort("updated_at", 1)
+    async for post in cursor.limit(count).batch_size(BULK_UPDATE_BATCH_SIZE):
+        yield post
+
+def fallback_update_batch(posts: List[Dict[str, Any]]) -> List[tuple]:
+    """(post, fields, error) for each post, rendered from the fallback template in one pass"""
+    rendered = generate_html_content_batch((post["title"], post["category"]) for post in posts)
+    return [
+        (post, content_update_fields(dict(zip(("content", "excerpt", "meta_description", "affiliate_links"), output))), None)
+        for post, output in zip(posts, rendered)
+    ]
+
+async def regenerate_posts(posts, workers: int, force_refresh: bool = False):
+    """Regenerate content for posts from an async iterator, keeping at most workers generations in flight"""
+    if not AI_ENABLED or not openai_client:
+        # Fallback renders are synchronous and memoized, so skip the per-post tasks and render whole batches
+        batch: List[Dict[str, Any]] = []
+        async for post in posts:
+            batch.append(post)
+            if len(batch) >= BULK_UPDATE_BATCH_SIZE:
+                for result in fallback_update_batch(batch):
+                    yield result
+                batch = []
+        for result in fallback_update_batch(batch):
+            yield result
+        return
+    
+    async def regenerate(post):
+        try:
+            ai_content = await generate_ai_content(post["title"], post["category"], post.get("tags", []), force_refresh)
+            return post, content_update_fields(ai_content), None
+        except Exception as e:
+            logging.error(f"Error updating post '{post['title']}': {e}")
+            return post, None, str(e)
+    
+    in_flight = set()
+    try:
+        async for post in posts:
+            in_flight.add(asyncio.create_task(regenerate(post)))
+            if len(in_flight) >= workers:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        while in_flight:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+async def write_refreshed_posts(batch: List[tuple], match_field: str) -> List[tuple]:
+    """Apply a batch of regenerated content with one bulk_write, returning (post, error) per entry"""
+    try:
+        await db.blog_posts.bulk_write(
+            [UpdateOne({match_field: post[match_field]}, {"$set": fields}) for post, fields in batch],
+            ordered=False
+        )
+        results = [(post, None) for post, _ in batch]
+    except BulkWriteError as e:
+        errors = {error["index"]: error.get("errmsg", "write failed") for error in e.details.get("writeErrors", [])}
+        results = [(post, errors.get(index)) for index, (post, _) in enumerate(batch)]
+    except Exception as e:
+        logging.error(f"Error writing refreshed posts: {e}")
+        # Some writes may still have landed, so drop every page in the batch
+        await invalidate_blog_posts(*[post.get("slug") for post, _ in batch])
+        return [(post, str(e)) for post, _ in batch]
+    # Only after the write lands, so a read racing it can't re-cache the old body
+    await invalidate_blog_posts(*[post.get("slug") for post, error in results if error is None])
+    return results
+
+async def refresh_posts(posts, workers: int, match_field: str = "_id", force_refresh: bool = False):
+    """Regenerate posts and write them in bulk_write batches, yielding (post, error) once each write lands"""
+    batch: List[tuple] = []
+    async for post, fields, error in regenerate_posts(posts, workers, force_refresh):
+        if error:
+            yield post, error
+            continue
+        batch.append((post, fields))
+        if len(batch) >= BULK_UPDATE_BATCH_SIZE:
+            for result in await write_refreshed_posts(batch, match_field):
+                yield result
+            batch = []
+    if batch:
+        for result in await write_refreshed_posts(batch, match_field):
+            yield result
+
+@api_router.post("/blog/update-content")
+async def update_existing_content(
+    count: int = Query(20, ge=0),
+    category: Optional[str] = None,
+    oldest_first: bool = False,
+    workers: int = Query(BULK_GENERATE_WORKERS, ge=1, le=32),
+    force_refresh: bool = False,
+    background: bool = False,
+    idempotency_key: Optional[str] = Header(None)
+):
+    """Update existing blog posts with enhanced content"""
+    if background:
+        # Streamed straight into job_items, so a large selection is never held in memory
+        async def items():
+            async for post in select_posts_for_refresh(count, category, oldest_first):
+                yield JobItem(title=post["title"], category=post["category"], post_id=post["id"], slug=post.get("slug"),
+                              tags=post.get("tags", []))
+        params = {"count": count, "category": category, "oldest_first": oldest_first, "workers": workers,
+                  "force_refresh": force_refresh}
+        return await submit_job("update_content", params, items(), idempotency_key)
+    
+    async def update():
+        try:
+            updated_count = 0
+            failed_count = 0
+            posts = select_posts_for_refresh(count, category, oldest_first)
+            async for post, error in refresh_posts(posts, workers, force_refresh=force_refresh):
+                if error:
+                    failed_count += 1
+                else:
+                    updated_count += 1
+            
+            return {
+                "message": f"Successfully updated {updated_count} blog posts",
+                "updated_count": updated_count,
+                "failed_count": failed_count
+            }
+            
+        except Exception as e:
+            logging.error(f"Error updating content: {e}")
+            return {"error": str(e)}
+    
+    params = {"count": count, "category": category, "oldest_first": oldest_first, "workers": workers, "force_refresh": force_refresh}
+    return await request_coalescer.run(f"update-content:{json.dumps(params, sort_keys=True)}", update)
+
+# Background jobs
+JOB_RUNNER_ID = WORKER_ID
+job_wakeup = asyncio.Event()
+
+async def store_job_items(job_id: str, items) -> tuple:
+    """Stream items into job_items in batches, returning (count, fingerprint of the items)"""
+    digest = hashlib.sha256()
+    batch: List[Dict[str, Any]] = []
+    total = 0
+    async for item in items:
+        digest.update(json.dumps(item.dict(), sort_keys=True).encode())
+        batch.append({"job_id": job_id, "index": total, **item.dict()})
+        total += 1
+        if len(batch) >= JOB_ITEM_BATCH_SIZE:
+            await db.job_items.insert_many(batch)
+            batch = []
+    if batch:
+        await db.job_items.insert_many(batch)
+    return total, digest.hexdigest()
+
+async def submit_job(job_type: str, params: Dict[str, Any], items, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+    """Queue a job over an async iterator of items, returning the existing one if this submit is a retry"""
+    job = Job(type=job_type, params=params, idempotency_key=idempotency_key)
+    # Per-item state lives in job_items, one small document per item, written before the job becomes claimable
+    total, items_digest = await store_job_items(job.id, items)
+    job.fingerprint = hashlib.sha256(
+        json.dumps({"type": job_type, "params": params, "items": items_digest}, sort_keys=True).encode()
+    ).hexdigest()
+    job.progress = {"total": total, "done": 0, "failed": 0, "skipped": 0}
+    if idempotency_key:
+        query = {"idempotency_key": idempotency_key}
+    else:
+        # Without an explicit key, identical submits share the job while it is active
+        query = {"fingerprint": job.fingerprint, "status": {"$in": ["queued", "running"]}}
+    
+    # Equality fields from the query are copied into the upserted document by Mongo itself
+    new_doc = {key: value for key, value in job.dict(exclude={"items"}).items() if key not in query or isinstance(query[key], dict)}
+    if not idempotency_key:
+        # Leave the field absent so keyless jobs stay out of the unique index
+        new_doc.pop("idempotency_key", None)
+    doc = await db.jobs.find_one_and_update(
+        query,
+        {"$setOnInsert": new_doc},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    created = doc["id"] == job.id
+    if created:
+        job_wakeup.set()
+    else:
+        await db.job_items.delete_many({"job_id": job.id})
+    return {"job_id": doc["id"], "status": doc["status"], "created": created, "status_url": f"/api/jobs/{doc['id']}"}
+
+async def claim_job() -> Optional[Dict[str, Any]]:
+    """Atomically take the oldest queued job, or one whose previous runner stopped heartbeating"""
+    now = datetime.utcnow()
+    return await db.jobs.find_one_and_update(
+        {"$or": [{"status": "queued"}, {"status": "running", "lease_expires_at": {"$lt": now}}]},
+        {
+            "$set": {
+                "status": "running",
+                "worker_id": JOB_RUNNER_ID,
+                "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+async def renew_job_lease(job_id: str):
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        await db.jobs.update_one(
+            {"id": job_id, "worker_id": JOB_RUNNER_ID},
+            {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS)}}
+        )
+
+async def record_job_item(job_id: str, index: int, status: str, **fields):
+    await db.job_items.update_one({"job_id": job_id, "index": index}, {"$set": {"status": status, **fields}})
+    await db.jobs.update_one({"id": job_id}, {"$set": {"updated_at": datetime.utcnow()}, "$inc": {f"progress.{status}": 1}})
+
+def pending_job_items(job: Dict[str, Any]):
+    return db.job_items.find({"job_id": job["id"], "status": "pending"}, {"_id": 0}).sort("index", 1)
+
+async def migrate_embedded_job_items(job: Dict[str, Any]):
+    """Move items of jobs queued before job_items existed out of the job document"""
+    if job.get("items"):
+        await db.job_items.bulk_write([
+            UpdateOne({"job_id": job["id"], "index": index}, {"$setOnInsert": item}, upsert=True)
+            for index, item in enumerate(job["items"])
+        ], ordered=False)
+        await db.jobs.update_one({"id": job["id"]}, {"$unset": {"items": ""}})
+
+async def run_bulk_generate_job(job: Dict[str, Any]):
+    pending: Dict[str, List[int]] = {}
+    topics = []
+    async for item in pending_job_items(job):
+        pending.setdefault(item["title"], []).append(item["index"])
+        topics.append({"title": item["title"], "category": item["category"]})
+    featured_slots = max(0, 5 - job["progress"].get("done", 0))
+    
+    workers = job["params"].get("workers", BULK_GENERATE_WORKERS)
+    force_refresh = job["params"].get("force_refresh", False)
+    async for event in bulk_generation_events(topics, workers, featured_slots, force_refresh):
+        indexes = pending.get(event.get("title"))
+        if not indexes:
+            continue
+        if event["status"] == "saved":
+            await record_job_item(job["id"], indexes.pop(0), "done", slug=event["slug"])
+        elif event["status"] == "skipped":
+            # Later duplicates of a title are the ones the planner skips
+            await record_job_item(job["id"], indexes.pop(), "skipped")
+        elif event["status"] == "error":
+            await record_job_item(job["id"], indexes.pop(0), "failed", error=event["error"])
+
+async def run_update_content_job(job: Dict[str, Any]):
+    async def pending_posts():
+        async for item in pending_job_items(job):
+            yield {"index": item["index"], "id": item["post_id"], "title": item["title"], "slug": item.get("slug"),
+                   "category": item["category"], "tags": item.get("tags", [])}
+    
+    workers = job["params"].get("workers", BULK_GENERATE_WORKERS)
+    force_refresh = job["params"].get("force_refresh", False)
+    async for post, error in refresh_posts(pending_posts(), workers, match_field="id", force_refresh=force_refresh):
+        if error:
+            await record_job_item(job["id"], post["index"], "failed", error=error)
+        else:
+            await record_job_item(job["id"], post["index"], "done")
+
+JOB_HANDLERS = {
+    "bulk_generate": run_bulk_generate_job,
+    "update_content": run_update_content_job,
+}
+
+async def execute_job(job: Dict[str, Any]):
+    heartbeat = asyncio.create_task(renew_job_lease(job["id"]))
+    status, error = "completed", None
+    try:
+        await migrate_embedded_job_items(job)
+        await JOB_HANDLERS[job["type"]](job)
+    except Exception as e:
+        logging.error(f"Job {job['id']} failed: {e}")
+        status, error = "failed", str(e)
+    finally:
+        heartbeat.cancel()
+    now = datetime.utcnow()
+    await db.jobs.update_one(
+        {"id": job["id"]},
+        {"$set": {"status": status, "error": error, "finished_at": now, "updated_at": now},
+         "$unset": {"lease_expires_at": ""}}
+    )
+
+async def run_job_worker():
+    """Claim and execute jobs until cancelled; interrupted jobs resume once their lease expires"""
+    while True:
+        try:
+            job = await claim_job()
+        except Exception as e:
+            logging.error(f"Error claiming job: {e}")
+            job = None
+        if job:
+            await execute_job(job)
+            continue
+        job_wakeup.clear()
+        await wait_for_wakeup(job_wakeup, JOB_POLL_SECONDS)
+
+@api_router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    """Get background job status with per-post progress"""
+    job = await db.jobs.find_one({"id": job_id})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if "items" not in job:
+        job["items"] = await db.job_items.find({"job_id": job_id}, {"_id": 0, "job_id": 0, "index": 0}).sort("index", 1).to_list(length=None)
+    return Job(**job)
+
+STATS_PIPELINE = [
+    {"$facet": {
+        "totals": [{"$group": {
+            "_id": None,
+            "total_posts": {"$sum": 1},
+            "published_posts": {"$sum": {"$cond": [{"$eq": ["$published", True]}, 1, 0]}},
+            "featured_posts": {"$sum": {"$cond": [{"$eq": ["$featured", True]}, 1, 0]}},
+            "total_views": {"$sum": "$views"}
+        }}],
+        "categories": [
+            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}}
+        ]
+    }}
+]
+
+async def load_stats() -> bytes:
+    result = await db.blog_posts.aggregate(STATS_PIPELINE).to_list(length=1)
+    facets = result[0] if result else {"totals": [], "categories": []}
+    totals = facets["totals"][0] if facets["totals"] else {}
+    return serialize_response({
+        "total_posts": totals.get("total_posts", 0),
+        "published_posts": totals.get("published_posts", 0),
+        "featured_posts": totals.get("featured_posts", 0),
+        "total_views": totals.get("total_views", 0),
+        "categories": {category["_id"]: category["count"] for category in facets["categories"]},
+        "ai_enabled": AI_ENABLED
+    })
+
+@api_router.get("/stats")
+async def get_stats(approximate: bool = False):
+    """Get platform statistics; approximate=true answers from collection metadata in constant time"""
+    try:
+        if approximate:
+            return {
+                "total_posts": await db.blog_posts.estimated_document_count(),
+                "approximate": True,
+                "ai_enabled": AI_ENABLED
+            }
+        body = await response_cache.get_or_load("stats", load_stats, ttl=STATS_CACHE_SECONDS)
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        logging.error(f"Error getting stats: {e}")
+        return {"error": str(e)}
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+@api_router.post("/newsletter/subscribe")
+async def subscribe_newsletter(email: str, name: Optional[str] = None):
+    """Subscribe to newsletter"""
+    try:
+        subscription = NewsletterSubscription(email=normalize_email(email), name=name)
+        # Single round trip: the unique email index makes the upsert race-free
+        result = await db.newsletter_subscriptions.update_one(
+            {"email": subscription.email},
+            {"$setOnInsert": {key: value for key, value in subscription.dict().items() if key != "email"}},
+            upsert=True
+        )
+        if result.upserted_id is None:
+            return {"message": "Already subscribed to newsletter"}
         return {"message": "Successfully subscribed to newsletter"}
+    except DuplicateKeyError:
+        # A concurrent upsert for the same email won the race
+        return {"message": "Already subscribed to newsletter"}
     except Exception as e:
         logging.error(f"Error subscribing to newsletter: {e}")
         return {"error": str(e)}
 
+async def iter_request_lines(request: Request):
+    """Yield decoded lines from a request body as it streams in"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+async def normalize_newsletter_emails():
+    """Normalize and dedupe emails stored before subscribe normalized them, so email_unique can be built"""
+    if "email_unique" in await db.newsletter_subscriptions.index_information():
+        return
+    keepers: Dict[str, Dict[str, Any]] = {}
+    duplicates = []
+    # Oldest first, so each address keeps its original subscription
+    subscriptions = db.newsletter_subscriptions.find({}, {"_id": 1, "email": 1, "name": 1, "active": 1}).sort("subscribed_at", 1)
+    async for subscription in subscriptions:
+        email = normalize_email(subscription.get("email") or "")
+        keeper = keepers.get(email)
+        if keeper is None:
+            keepers[email] = {**subscription, "original": dict(subscription), "email": email}
+            continue
+        duplicates.append(subscription["_id"])
+        keeper["active"] = keeper.get("active", True) or subscription.get("active", True)
+        keeper["name"] = keeper.get("name") or subscription.get("name")
+    updates = [
+        UpdateOne({"_id": keeper["_id"]}, {"$set": {"email": email, "name": keeper.get("name"), "active": keeper.get("active", True)}})
+        for email, keeper in keepers.items()
+        if any(keeper.get(field) != keeper["original"].get(field) for field in ("email", "name", "active"))
+    ]
+    if duplicates:
+        await db.newsletter_subscriptions.delete_many({"_id": {"$in": duplicates}})
+    if updates:
+        await db.newsletter_subscriptions.bulk_write(updates, ordered=False)
+    if duplicates or updates:
+        logging.warning(f"Normalized {len(updates)} newsletter emails and removed {len(duplicates)} duplicates")
+
+async def insert_subscriptions(batch: List[Dict[str, Any]]) -> tuple:
+    """Insert a batch of subscriptions, returning (inserted, duplicates)"""
+    try:
+        result = await db.newsletter_subscriptions.insert_many(batch, ordered=False)
+        return len(result.inserted_ids), 0
+    except BulkWriteError as e:
+        duplicates = sum(1 for error in e.details.get("writeErrors", []) if error.get("code") == 11000)
+        return e.details.get("nInserted", 0), duplicates
+
+@api_router.post("/newsletter/import")
+async def import_newsletter_subscribers(request: Request):
+    """Bulk import subscribers from a CSV body with an email column and optional name column"""
+    imported = duplicates = invalid = 0
+    batch: List[Dict[str, Any]] = []
+    columns = None
+    
+    async for line in iter_request_lines(request):
+        if not line.strip():
+            continue
+        row = next(csv.reader([line]))
+        if columns is None:
+            header = [column.strip().lower() for column in row]
+            if "email" in header:
+                columns = header
+                continue
+            columns = ["email", "name"]
+        record = dict(zip(columns, row))
+        email = normalize_email(record.get("email", ""))
+        if not EMAIL_RE.match(email):
+            invalid += 1
+            continue
+        batch.append(NewsletterSubscription(email=email, name=record.get("name") or None).dict())
+        if len(batch) >= NEWSLETTER_IMPORT_BATCH_SIZE:
+            inserted, duplicate_count = await insert_subscriptions(batch)
+            imported, duplicates = imported + inserted, duplicates + duplicate_count
+            batch = []
+    if batch:
+        inserted, duplicate_count = await insert_subscriptions(batch)
+        imported, duplicates = imported + inserted, duplicates + duplicate_count
+    
+    return {
+        "message": f"Imported {imported} newsletter subscribers",
+        "imported": imported,
+        "duplicates": duplicates,
+        "invalid": invalid
+    }
+
+# Tool catalog import
+TOOL_LIST_FIELDS = ("features", "pros", "cons")
+
+def normalize_tool_name(name: str) -> str:
+    """Key tools by case- and whitespace-insensitive name so re-imports update instead of duplicating"""
+    return " ".join(name.split()).lower()
+
+def parse_tool_csv_row(record: Dict[str, str]) -> Dict[str, Any]:
+    """CSV cells are flat, so list fields are pipe-separated and an empty list cell is an empty list"""
+    row: Dict[str, Any] = {key: value for key, value in record.items() if key and value not in (None, "")}
+    for field in TOOL_LIST_FIELDS:
+        if field in record:
+            row[field] = [item.strip() for item in (record[field] or "").split("|") if item.strip()]
+    return row
+
+def tool_upsert(tool: SaaSTool, now: datetime) -> UpdateOne:
+    doc = tool.dict()
+    # Existing tools keep their id and creation time; everything else comes from the catalog
+    on_insert = {"id": doc.pop("id"), "created_at": doc.pop("created_at")}
+    doc.pop("updated_at")
+    name_key = normalize_tool_name(tool.name)
+    return UpdateOne(
+        {"name_key": name_key},
+        {"$set": {**doc, "name_key": name_key, "updated_at": now}, "$setOnInsert": on_insert},
+        upsert=True
+    )
+
+async def write_tool_batch(batch: Dict[str, SaaSTool]) -> tuple:
+    """Upsert a batch, returning (inserted, updated, rejected)"""
+    # Stamped at write time, so incremental index refreshes that ran earlier in the import still see the batch
+    now = datetime.utcnow()
+    try:
+        result = await db.saas_tools.bulk_write([tool_upsert(tool, now) for tool in batch.values()], ordered=False)
+        return result.upserted_count, result.matched_count, 0
+    except BulkWriteError as e:
+        return e.details.get("nUpserted", 0), e.details.get("nMatched", 0), len(e.details.get("writeErrors", []))
+
+async def backfill_tool_name_keys():
+    """Give tools loaded before name keys existed one, so imports match them; failures are logged, not fatal"""
+    try:
+        updates = [
+            UpdateOne({"_id": tool["_id"]}, {"$set": {"name_key": normalize_tool_name(tool["name"])}})
+            async for tool in db.saas_tools.find({"name_key": {"$exists": False}}, {"_id": 1, "name": 1})
+        ]
+        if updates:
+            await db.saas_tools.bulk_write(updates, ordered=False)
+    except BulkWriteError as e:
+        logging.error(f"Tools with duplicate names left without a name key: {len(e.details.get('writeErrors', []))}")
+    except Exception as e:
+        logging.error(f"Error backfilling tool name keys: {e}")
+
+@api_router.post("/tools/import")
+async def import_tools(request: Request, input_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$")):
+    """Bulk upsert tools by normalized name from an NDJSON or CSV body (list fields pipe-separated)"""
+    content_type = request.headers.get("content-type", "")
+    input_format = input_format or ("csv" if "csv" in content_type else "ndjson")
+    inserted = updated = rejected = duplicates = 0
+    errors: List[Dict[str, Any]] = []
+    batch: Dict[str, SaaSTool] = {}
+    pending: Optional[asyncio.Task] = None
+    columns = None
+    line_number = 0
+    
+    def reject(message: str):
+        nonlocal rejected
+        rejected += 1
+        if len(errors) < TOOL_IMPORT_MAX_ERRORS:
+            errors.append({"line": line_number, "error": message})
+    
+    async def collect(task: Optional[asyncio.Task]):
+        nonlocal inserted, updated, rejected
+        if task is not None:
+            batch_inserted, batch_updated, batch_rejected = await task
+            inserted, updated, rejected = inserted + batch_inserted, updated + batch_updated, rejected + batch_rejected
+    
+    started_at = datetime.utcnow()
+    async for line in iter_request_lines(request):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            if input_format == "csv":
+                row = next(csv.reader([line]))
+                if columns is None:
+                    columns = [column.strip().lower() for column in row]
+                    continue
+                record = parse_tool_csv_row(dict(zip(columns, row)))
+            else:
+                record = orjson.loads(line)
+            tool = SaaSTool(**record)
+        except ValidationError as e:
+            reject("; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()))
+            continue
+        except (ValueError, TypeError) as e:
+            reject(str(e))
+            continue
+        
+        # Two rows for the same tool in one unordered batch would race; the later row wins
+        key = normalize_tool_name(tool.name)
+        if key in batch:
+            duplicates += 1
+        batch[key] = tool
+        if len(batch) >= TOOL_IMPORT_BATCH_SIZE:
+            # Keep one batch in flight while the next one is parsed
+            await collect(pending)
+            pending = asyncio.create_task(write_tool_batch(batch))
+            batch = {}
+    await collect(pending)
+    if batch:
+        await collect(asyncio.create_task(write_tool_batch(batch)))
+    
+    if inserted or updated:
+        # Every batch is stamped after the import started, so this reindexes all of them
+        async for tool in db.saas_tools.find({"updated_at": {"$gte": started_at}}, ToolSearchIndex.PROJECTION):
+            tool_search_index.add(tool)
+        await invalidate_tools(since=started_at)
+    
+    return {
+        "message": f"Imported {inserted + updated} tools",
+        "inserted": inserted,
+        "updated": updated,
+        "rejected": rejected,
+        "duplicates": duplicates,
+        "errors": errors
+    }
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Get response cache hit/miss statistics"""
+    return response_cache.stats()
+
 # Generic slug endpoint MUST come last
+@api_router.get("/blog/{slug}/related")
+async def get_related(slug: str, limit: int = Query(5, ge=1, le=20), tools_limit: int = Query(5, ge=0, le=20)):
+    """Related posts and the tools most relevant to a post, served from the in-memory similarity indexes"""
+    terms = related_posts_index.terms.get(slug)
+    if terms is None:
+        # Not indexed yet (new post or index still warming up)
+        post = await db.blog_posts.find_one({"slug": slug, "published": True}, related_posts_index.projection)
+        if not post:
+            raise HTTPException(status_code=404, detail="Blog post not found")
+        terms = related_posts_index.vectorize(post)
+    result = {
+        "posts": related_posts_index.similar(terms, limit, exclude=slug),
+        "tools": related_tools_index.similar(terms, tools_limit) if tools_limit else []
+    }
+    return Response(content=serialize_response(result), media_type="application/json")
+
 @api_router.get("/blog/{slug}", response_model=BlogPost)
 async def get_blog_post(slug: str):
     """Get a specific blog post by slug"""
-    try:
-        post = await db.blog_posts.find_one({"slug": slug})
+    async def load_post() -> tuple:
+        post = await db.blog_posts.find_one({"slug": slug}, BLOG_POST_PROJECTION)
         if not post:
             raise HTTPException(status_code=404, detail="Blog post not found")
+        return serialize_response(read_models(BlogPost, [post])[0]), post.get("updated_at")
+    
+    try:
+        body, updated_at = await response_cache.get_or_load(f"blog:{slug}", load_post)
         
         # Increment view count
-        await db.blog_posts.update_one(
-            {"slug": slug},
-            {"$inc": {"views": 1}}
-        )
+        if VIEW_COUNT_MODE == "sync":
+            await db.blog_posts.update_one(
+                {"slug": slug},
+                {"$inc": {"views": 1}}
+            )
+        else:
+            view_counter.increment(slug)
         
-        return BlogPost(**post)
+        headers = {}
+        if updated_at:
+            headers["Last-Modified"] = format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True)
+        return Response(content=body, media_type="application/json", headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -600,13 +2752,247 @@ async def get_blog_post(slug: str):
 # Include router
 app.include_router(api_router)
 
+@app.on_event("startup")
+async def open_clients():
+    connect_to_mongo()
+    connect_to_openai()
+    # Warm the pool so the first requests don't pay for connection setup
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        logging.error(f"MongoDB warm-up ping failed: {e}")
+
+@app.on_event("startup")
+async def start_tool_search_index():
+    app.state.tool_search_task = asyncio.create_task(refresh_tool_search_index_periodically())
+
+@app.on_event("startup")
+async def start_recommendation_indexes():
+    app.state.recommendation_task = asyncio.create_task(refresh_recommendation_indexes_periodically())
+
+@app.on_event("startup")
+async def create_indexes():
+    await normalize_newsletter_emails()
+    await apply_index_registry()
+    await backfill_tool_name_keys()
+    if INDEX_CHECK_ON_STARTUP:
+        for shape in await check_query_plans():
+            if shape["collscan"]:
+                logging.warning(f"Query on {shape['collection']} falls back to COLLSCAN: {shape['filter']} sort={shape['sort']}")
+
+@app.on_event("startup")
+async def sync_generation_cache_size():
+    await reconcile_generation_cache_size()
+
+@app.on_event("startup")
+async def start_job_workers():
+    app.state.job_workers = [asyncio.create_task(run_job_worker()) for _ in range(JOB_RUNNER_CONCURRENCY)]
+
+@app.on_event("startup")
+async def start_view_counter():
+    app.state.view_flush_task = asyncio.create_task(flush_view_counts_periodically())
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    tasks = [app.state.view_flush_task, app.state.tool_search_task, app.state.recommendation_task, *app.state.job_workers]
+    if hasattr(app.state, "cache_sync_task"):
+        tasks.append(app.state.cache_sync_task)
+    for task in tasks:
+        task.cancel()
+    # Buffered views go out first, so a task that is slow to stop can't cost them
+    await asyncio.wait({app.state.view_flush_task}, timeout=SHUTDOWN_TIMEOUT_SECONDS)
+    await view_counter.flush(db.blog_posts)
+    _, still_running = await asyncio.wait(set(tasks), timeout=SHUTDOWN_TIMEOUT_SECONDS)
+    if still_running:
+        logging.warning(f"{len(still_running)} background tasks did not stop within {SHUTDOWN_TIMEOUT_SECONDS}s")
+
+@app.on_event("startup")
+async def start_cache_invalidation_sync():
+    if WEB_CONCURRENCY > 1:
+        app.state.cache_sync_task = asyncio.create_task(sync_cache_invalidations_periodically())
+
+@app.on_event("shutdown")
+async def close_clients():
+    if openai_client is not None:
+        await openai_client.close()
+    client.close()
+
 @app.get("/")
 async def main_root():
     return {"message": "SaaS Tools Digital", "status": "operational"}
 
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy", "service": "SaaS Tools Digital API"}
+async def readiness_check():
+    """Readiness: MongoDB answers a ping, plus how saturated the Mongo pool and LLM slots are"""
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), timeout=HEALTH_CHECK_TIMEOUT_SECONDS)
+        mongo_ok = True
+    except Exception as e:
+        logging.error(f"Readiness ping failed: {e}")
+        mongo_ok = False
+    
+    checked_out = metrics.value("mongo_pool_checked_out")
+    llm_in_flight = metrics.value("llm_requests_in_flight")
+    body = {
+        "status": "healthy" if mongo_ok else "unavailable",
+        "service": "SaaS Tools Digital API",
+        "worker": WORKER_ID,
+        "mongo": {
+            "ok": mongo_ok,
+            "connections": metrics.value("mongo_pool_connections"),
+            "checked_out": checked_out,
+            "max_pool_size": MONGO_MAX_POOL_SIZE,
+            "saturation": round(checked_out / MONGO_MAX_POOL_SIZE, 3)
+        },
+        "llm": {
+            "enabled": AI_ENABLED,
+            "in_flight": llm_in_flight,
+            "max_concurrency": OPENAI_WORKER_CONCURRENCY,
+            "saturation": round(llm_in_flight / OPENAI_WORKER_CONCURRENCY, 3)
+        }
+    }
+    return Response(content=serialize_response(body), media_type="application/json", status_code=200 if mongo_ok else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics for HTTP routes, MongoDB commands and LLM calls"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# Conditional requests and compression for read endpoints
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+HTTP_CACHE_RULES = [
+    (re.compile(r"^/api/blog/[^/]+$"), os.environ.get('CACHE_CONTROL_BLOG_POST', 'public, max-age=300')),
+    (re.compile(r"^/api/blog$"), os.environ.get('CACHE_CONTROL_BLOG_LIST', 'public, max-age=60')),
+    (re.compile(r"^/api/tools$"), os.environ.get('CACHE_CONTROL_TOOLS', 'public, max-age=60')),
+]
+
+def not_modified(request_headers: Headers, etag: str, last_modified: Optional[str]) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison: W/ prefixes are ignored on both sides
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+class HTTPCacheMiddleware:
+    """Adds ETag/Cache-Control validators, answers 304s and gzips bodies on the configured GET routes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        cache_control = next((value for pattern, value in HTTP_CACHE_RULES if pattern.match(scope["path"])), None)
+        if cache_control is None:
+            return await self.app(scope, receive, send)
+        
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+        
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            else:
+                chunks.append(message.get("body", b""))
+        
+        await self.app(scope, receive, capture)
+        body = b"".join(chunks)
+        headers = MutableHeaders(raw=list(start["headers"]))
+        if start["status"] == 200:
+            etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            headers["ETag"] = etag
+            headers["Cache-Control"] = cache_control
+            headers["Vary"] = "Accept-Encoding"
+            request_headers = Headers(scope=scope)
+            if not_modified(request_headers, etag, headers.get("last-modified")):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            if len(body) >= COMPRESSION_MIN_SIZE and "gzip" in request_headers.get("accept-encoding", ""):
+                body = gzip.compress(body, compresslevel=6)
+                headers["Content-Encoding"] = "gzip"
+            headers["Content-Length"] = str(len(body))
+        await send({"type": "http.response.start", "status": start["status"], "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
+
+app.add_middleware(HTTPCacheMiddleware)
+
+class RateLimitMiddleware:
+    """Rejects callers over their per-client budget for the expensive routes with 429 and Retry-After"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not RATE_LIMIT_ENABLED:
+            return await self.app(scope, receive, send)
+        query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        matched = rate_limiter.match(scope["method"], scope["path"], query)
+        if matched is None:
+            return await self.app(scope, receive, send)
+        
+        retry_after = await rate_limiter.check(matched[0], rate_limit_client_key(scope), matched[1])
+        if not retry_after:
+            return await self.app(scope, receive, send)
+        body = serialize_response({"detail": "Rate limit exceeded"})
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(retry_after)).encode()),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+# Inside CORS so 429s still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
+class MetricsMiddleware:
+    """Records per-route latency, status codes and in-flight requests, and adds a Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        timings: Dict[str, float] = {}
+        token = request_timings.set(timings)
+        started_at = time.perf_counter()
+        status = {"code": 500}
+        
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    entries = [f"{kind};dur={seconds * 1000:.1f}" for kind, seconds in timings.items()]
+                    entries.append(f"app;dur={(time.perf_counter() - started_at) * 1000:.1f}")
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", ", ".join(entries))
+            await send(message)
+        
+        metrics.inc("http_requests_in_flight")
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.inc("http_requests_in_flight", amount=-1)
+            request_timings.reset(token)
+            route = scope.get("route")
+            labels = {"method": scope["method"], "route": route.path if route else "unmatched"}
+            metrics.observe("http_request_duration_seconds", labels, time.perf_counter() - started_at)
+            metrics.inc("http_requests_total", {**labels, "status": str(status["code"])})
 
 # CORS middleware
 app.add_middleware(
@@ -617,6 +3003,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so timings include every other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -624,7 +3013,161 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Static site export
+EXPORT_DIR = os.environ.get('EXPORT_DIR', str(ROOT_DIR / 'site'))
+EXPORT_BASE_URL = os.environ.get('EXPORT_BASE_URL', 'http://localhost:8000').rstrip('/')
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 200))
+EXPORT_MANIFEST_NAME = "manifest.json"
+
+EXPORT_POST_TEMPLATE = CompiledTemplate(minify_html("""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1">
+        <title>{meta_title}</title>
+        <meta name="description" content="{meta_description}">
+        <link rel="canonical" href="{canonical_url}">
+    </head>
+    <body>
+        <nav><a href="/">Home</a> / <a href="/category/{category_slug}/">{category}</a></nav>
+        {content}
+    </body>
+    </html>
+"""))
+
+EXPORT_CATEGORY_TEMPLATE = CompiledTemplate(minify_html("""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1">
+        <title>{category} Articles</title>
+        <link rel="canonical" href="{canonical_url}">
+    </head>
+    <body>
+        <h1>{category} Articles</h1>
+        <ul>{items}</ul>
+    </body>
+    </html>
+"""))
+
+def write_export_file(path: Path, data: bytes):
+    """Write via a temp file and rename so the CDN never serves a half-written file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+
+def render_export_post(post: Dict[str, Any]) -> bytes:
+    return EXPORT_POST_TEMPLATE.render({
+        "meta_title": html.escape(post.get("meta_title") or post["title"]),
+        "meta_description": html.escape(post.get("meta_description") or ""),
+        "canonical_url": f"{EXPORT_BASE_URL}/blog/{post['slug']}/",
+        "category": html.escape(post["category"]),
+        "category_slug": slugify(post["category"]),
+        # Content is HTML the app generated itself
+        "content": post["content"],
+    }).encode()
+
+def render_export_category(category: str, entries: List[Dict[str, str]]) -> bytes:
+    items = "".join(
+        f'<li><a href="/blog/{entry["slug"]}/">{html.escape(entry["title"])}</a></li>'
+        for entry in sorted(entries, key=lambda entry: entry["created_at"], reverse=True)
+    )
+    return EXPORT_CATEGORY_TEMPLATE.render({
+        "category": html.escape(category),
+        "canonical_url": f"{EXPORT_BASE_URL}/category/{slugify(category)}/",
+        "items": items,
+    }).encode()
+
+def render_sitemap(manifest_posts: Dict[str, Dict[str, str]]) -> bytes:
+    urls = [f"<url><loc>{EXPORT_BASE_URL}/</loc></url>"]
+    for category in sorted({entry["category"] for entry in manifest_posts.values()}):
+        urls.append(f"<url><loc>{EXPORT_BASE_URL}/category/{slugify(category)}/</loc></url>")
+    for slug, entry in sorted(manifest_posts.items()):
+        urls.append(f"<url><loc>{EXPORT_BASE_URL}/blog/{slug}/</loc><lastmod>{entry['updated_at'][:10]}</lastmod></url>")
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + "".join(urls) + "</urlset>"
+    ).encode()
+
+async def export_static_site(output_dir: str = EXPORT_DIR, full: bool = False) -> Dict[str, Any]:
+    """Write published posts as JSON and HTML plus sitemap and category pages, rewriting only what changed"""
+    root = Path(output_dir)
+    manifest_path = root / EXPORT_MANIFEST_NAME
+    previous = {}
+    if manifest_path.exists() and not full:
+        previous = json.loads(manifest_path.read_text()).get("posts", {})
+    
+    # A light pass over slugs and timestamps decides what needs the full documents
+    current: Dict[str, Dict[str, str]] = {}
+    changed: List[str] = []
+    projection = {"_id": 0, "slug": 1, "title": 1, "category": 1, "created_at": 1, "updated_at": 1}
+    async for post in db.blog_posts.find({"published": True}, projection):
+        entry = {
+            "title": post["title"],
+            "category": post["category"],
+            "created_at": post["created_at"].isoformat(),
+            "updated_at": post["updated_at"].isoformat(),
+        }
+        current[post["slug"]] = entry
+        if previous.get(post["slug"]) != entry:
+            changed.append(post["slug"])
+    removed = [slug for slug in previous if slug not in current]
+    
+    for start in range(0, len(changed), EXPORT_BATCH_SIZE):
+        batch = changed[start:start + EXPORT_BATCH_SIZE]
+        async for post in db.blog_posts.find({"slug": {"$in": batch}, "published": True}, BLOG_POST_PROJECTION):
+            write_export_file(root / "blog" / f"{post['slug']}.json", serialize_response(post))
+            write_export_file(root / "blog" / post["slug"] / "index.html", render_export_post(post))
+    for slug in removed:
+        (root / "blog" / f"{slug}.json").unlink(missing_ok=True)
+        (root / "blog" / slug / "index.html").unlink(missing_ok=True)
+        try:
+            (root / "blog" / slug).rmdir()
+        except OSError:
+            pass
+    
+    # Category pages only change when one of their posts was added, edited, moved or removed
+    touched = {current[slug]["category"] for slug in changed} | {previous[slug]["category"] for slug in changed + removed if slug in previous}
+    by_category: Dict[str, List[Dict[str, str]]] = {}
+    for slug, entry in current.items():
+        if entry["category"] in touched:
+            by_category.setdefault(entry["category"], []).append({"slug": slug, **entry})
+    for category in touched:
+        page = root / "category" / slugify(category) / "index.html"
+        if category in by_category:
+            write_export_file(page, render_export_category(category, by_category[category]))
+        else:
+            page.unlink(missing_ok=True)
+    
+    if changed or removed or not (root / "sitemap.xml").exists():
+        write_export_file(root / "sitemap.xml", render_sitemap(current))
+    write_export_file(manifest_path, json.dumps({"exported_at": datetime.utcnow().isoformat(), "posts": current}).encode())
+    return {"written": len(changed), "unchanged": len(current) - len(changed), "removed": len(removed), "categories": len(touched)}
+
+async def run_site_export(args: List[str]) -> int:
+    connect_to_mongo()
+    positional = [arg for arg in args if not arg.startswith("--")]
+    summary = await export_static_site(positional[0] if positional else EXPORT_DIR, full="--full" in args)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+async def run_index_check() -> int:
+    connect_to_mongo()
+    await apply_index_registry()
+    report = await check_query_plans()
+    print(json.dumps(report, indent=2, default=str))
+    return 1 if any(shape["collscan"] for shape in report) else 0
+
 if __name__ == "__main__":
+    if sys.argv[1:] == ["check-indexes"]:
+        sys.exit(asyncio.run(run_index_check()))
+    if sys.argv[1:2] == ["export-site"]:
+        sys.exit(asyncio.run(run_site_export(sys.argv[2:])))
+    
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Workers need an import string so each process builds its own app
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=WEB_CONCURRENCY)
@@ -0,0 +1,32 @@
+import os
+import sys
+from pathlib import Path
+
+import motor.motor_asyncio
+import mongomock_motor
+import pytest
+
+# main reads its config at import time, and the suite runs against mongomock instead of a live server
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_saas_tools")
+os.environ.pop("OPENAI_API_KEY", None)
+motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiter():
+    # Expensive routes allow only a couple of calls per minute, which tests would otherwise share
+    main.rate_limiter.backend = main.InMemoryRateLimitBackend(main.RATE_LIMIT_MAX_CLIENTS)
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+        test_client.portal.call(main.client.drop_database, os.environ["DB_NAME"])
+    # Cached responses would outlive the dropped database
+    main.response_cache.invalidate_prefix("")
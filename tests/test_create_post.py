@@ -0,0 +1,4 @@
+def test_post_created_without_content_is_published(client):
+    created = client.post("/api/blog", json={"title": "Outline only", "category": "Sales", "generate_content": False}).json()
+    assert created["published"] is True
+    assert client.get(f"/api/blog/{created['slug']}").status_code == 200
@@ -0,0 +1,18 @@
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("payload", [{"k": [1]}, {"k": 1}, {"k": ["not-a-date", "id"]}, {"k": [None, 5]}, {"o": -1}, {"o": "3"}, [1, 2]])
+@pytest.mark.parametrize("path", ["/api/blog", "/api/tools"])
+def test_malformed_cursors_are_rejected(client, path, payload):
+    response = client.get(path, params={"cursor": main.encode_cursor(payload)})
+    assert response.status_code == 400
+
+
+def test_well_formed_cursor_pages_through(client):
+    for title in ("First post", "Second post"):
+        assert client.post("/api/blog", json={"title": title, "category": "Sales"}).status_code == 200
+    first = client.get("/api/blog", params={"cursor": "", "limit": 1}).json()
+    second = client.get("/api/blog", params={"cursor": first["next_cursor"], "limit": 1}).json()
+    assert [first["items"][0]["title"], second["items"][0]["title"]] == ["Second post", "First post"]
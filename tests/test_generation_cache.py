@@ -0,0 +1,26 @@
+import main
+
+
+def test_running_size_tracks_writes_and_evicts_least_recently_used(client, monkeypatch):
+    monkeypatch.setattr(main, "GENERATION_CACHE_MAX_BYTES", 25)
+
+    async def fill():
+        for key in ("a", "b", "c"):
+            await main.write_generation_cache(key, "x" * 10, "model")
+        # Rewriting an entry only counts the change in its size
+        await main.write_generation_cache("c", "x" * 5, "model")
+        keys = [entry["key"] async for entry in main.db.generation_cache.find({}, {"key": 1})]
+        counter = await main.db.counters.find_one({"_id": main.GENERATION_CACHE_SIZE_ID})
+        return sorted(keys), counter["bytes"]
+
+    assert client.portal.call(fill) == (["b", "c"], 15)
+
+
+def test_reconcile_resets_running_size_from_collection(client):
+    async def reconcile():
+        await main.db.generation_cache.insert_many([{"key": "a", "size": 7}, {"key": "b", "size": 4}])
+        await main.add_generation_cache_size(1000)
+        await main.reconcile_generation_cache_size()
+        return (await main.db.counters.find_one({"_id": main.GENERATION_CACHE_SIZE_ID}))["bytes"]
+
+    assert client.portal.call(reconcile) == 11
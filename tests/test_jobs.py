@@ -0,0 +1,50 @@
+import time
+
+import main
+
+
+def wait_for_job(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_posts_lost_to_insert_errors_are_reported_as_failed(client, monkeypatch):
+    plan_bulk_generation = main.plan_bulk_generation
+
+    async def plan_then_race(topics, featured_slots=5):
+        plan = await plan_bulk_generation(topics, featured_slots)
+        # Another writer takes the first title after planning, so its insert hits the unique index
+        await main.db.blog_posts.insert_one({"id": "racer", "title": topics[0]["title"], "slug": "racer"})
+        return plan
+
+    monkeypatch.setattr(main, "plan_bulk_generation", plan_then_race)
+    topics = [{"title": "Raced topic", "category": "Sales"}, {"title": "Clean topic", "category": "Sales"}]
+    job_id = client.post("/api/blog/bulk-generate", params={"background": True}, json={"topics": topics}).json()["job_id"]
+    job = wait_for_job(client, job_id)
+    assert [item["status"] for item in job["items"]] == ["failed", "done"]
+    assert (job["progress"]["done"], job["progress"]["failed"]) == (1, 1)
+
+
+def test_background_update_content_keeps_items_out_of_the_job_document(client):
+    for title in ("First job post", "Second job post"):
+        client.post("/api/blog", json={"title": title, "category": "Sales", "generate_content": False})
+    job_id = client.post("/api/blog/update-content", params={"count": 2, "background": True}).json()["job_id"]
+    job = wait_for_job(client, job_id)
+    assert [item["status"] for item in job["items"]] == ["done", "done"]
+    assert job["progress"]["done"] == 2
+    stored = client.portal.call(main.db.jobs.find_one, {"id": job_id})
+    assert "items" not in stored
+
+
+def test_jobs_queued_with_embedded_items_still_run(client):
+    legacy = main.Job(type="bulk_generate", items=[main.JobItem(title="Legacy topic", category="Sales")],
+                      progress={"total": 1, "done": 0, "failed": 0, "skipped": 0})
+    client.portal.call(main.db.jobs.insert_one, legacy.dict())
+    client.portal.call(main.job_wakeup.set)
+    job = wait_for_job(client, legacy.id)
+    assert [item["status"] for item in job["items"]] == ["done"]
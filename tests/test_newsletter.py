@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import main
+
+
+def subscription(email, minutes_ago, name=None, active=True):
+    return {"email": email, "name": name, "active": active, "subscribed_at": datetime.utcnow() - timedelta(minutes=minutes_ago)}
+
+
+def test_startup_normalizes_and_dedupes_existing_emails(client):
+    async def migrate():
+        collection = main.db.newsletter_subscriptions
+        await collection.drop_indexes()
+        await collection.insert_many([
+            subscription(" Reader@Example.com", 30),
+            subscription("reader@example.com", 20, name="Reader", active=False),
+            subscription("READER@example.com ", 10),
+            subscription("other@example.com", 5),
+        ])
+        await main.create_indexes()
+        return await collection.find({}, {"_id": 0, "email": 1, "name": 1}).sort("email", 1).to_list(length=None), await collection.index_information()
+
+    subscriptions, indexes = client.portal.call(migrate)
+    assert subscriptions == [{"email": "other@example.com", "name": None}, {"email": "reader@example.com", "name": "Reader"}]
+    assert "email_unique" in indexes
+    assert client.post("/api/newsletter/subscribe", params={"email": "READER@example.com"}).json()["message"] == "Already subscribed to newsletter"
+
+
+def test_missing_unique_email_index_aborts_startup(client):
+    async def build_over_duplicates():
+        collection = main.db.newsletter_subscriptions
+        await collection.drop_indexes()
+        await collection.insert_many([subscription("dup@example.com", 2), subscription("dup@example.com", 1)])
+        await main.apply_index_registry()
+
+    with pytest.raises(RuntimeError, match="email_unique"):
+        client.portal.call(build_over_duplicates)
@@ -0,0 +1,31 @@
+import uuid
+
+import main
+
+
+def update_content(client, headers):
+    return client.post("/api/blog/update-content", params={"count": 0}, headers=headers)
+
+
+def test_rotating_forwarded_for_prefix_is_still_limited(client):
+    # The proxy appends the real peer, so only the rightmost hop identifies the caller
+    codes = [
+        update_content(client, {"x-forwarded-for": f"10.0.0.{attempt}, 203.0.113.7"}).status_code
+        for attempt in range(6)
+    ]
+    assert codes[:2] == [200, 200]
+    assert set(codes[2:]) == {429}
+
+
+def test_unknown_api_keys_are_ignored(client):
+    codes = [update_content(client, {"x-api-key": uuid.uuid4().hex}).status_code for _ in range(6)]
+    assert codes[:2] == [200, 200]
+    assert set(codes[2:]) == {429}
+
+
+def test_known_api_key_gets_its_own_budget(client, monkeypatch):
+    monkeypatch.setattr(main, "RATE_LIMIT_API_KEYS", frozenset({"partner-key"}))
+    for _ in range(2):
+        update_content(client, {})
+    assert update_content(client, {}).status_code == 429
+    assert update_content(client, {"x-api-key": "partner-key"}).status_code == 200
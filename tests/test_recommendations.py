@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import main
+
+
+def make_post(slug, title, category, tags):
+    return {"id": slug, "slug": slug, "title": title, "category": category, "tags": tags, "published": True, "updated_at": datetime.utcnow()}
+
+
+POSTS = [
+    make_post("crm-a", "Best CRM tools for sales", "Sales", ["crm", "sales"]),
+    make_post("crm-b", "Sales CRM: best tools for", "Sales", ["crm", "sales"]),
+    make_post("crm-c", "CRM automation guide", "Sales", ["crm", "automation"]),
+    make_post("design", "Design tools roundup", "Design", ["design", "figma"]),
+    make_post("email", "Email marketing playbook", "Marketing", ["email", "newsletter"]),
+]
+
+
+def build_index(client, posts):
+    index = main.RecommendationIndex("blog_posts", "slug", {"title": 1, "category": 1, "tags": 1}, {"published": True}, main.post_terms)
+
+    async def load():
+        await main.db.blog_posts.delete_many({})
+        await main.db.blog_posts.insert_many([dict(post) for post in posts])
+        await index.refresh(main.db.blog_posts)
+
+    client.portal.call(load)
+    return index
+
+
+def scores_for(index, slug):
+    return {hit["slug"]: hit["score"] for hit in index.similar(index.terms[slug], limit=10, exclude=slug)}
+
+
+def test_identical_documents_score_one_and_all_scores_are_bounded(client):
+    index = build_index(client, POSTS)
+    for post in POSTS:
+        scores = scores_for(index, post["slug"])
+        assert all(0 < score <= 1.0 for score in scores.values())
+    assert scores_for(index, "crm-a")["crm-b"] == scores_for(index, "crm-b")["crm-a"] == 1.0
+
+
+def test_scores_do_not_depend_on_load_order(client):
+    forward = build_index(client, POSTS)
+    backward = build_index(client, list(reversed(POSTS)))
+    for post in POSTS:
+        assert scores_for(forward, post["slug"]) == scores_for(backward, post["slug"])
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_cancellation_racing_a_wakeup_stops_the_loop():
+    async def race():
+        event = asyncio.Event()
+
+        async def loop():
+            while True:
+                await main.wait_for_wakeup(event, 60)
+
+        task = asyncio.create_task(loop())
+        await asyncio.sleep(0)
+        event.set()
+        task.cancel()
+        await asyncio.wait({task}, timeout=1)
+        return task.done()
+
+    assert asyncio.run(race())
+
+
+def test_shutdown_after_a_blog_write_finishes_and_flushes_views():
+    def write_then_shut_down():
+        with TestClient(main.app) as test_client:
+            slug = test_client.post("/api/blog", json={"title": "Shutdown post", "category": "Sales"}).json()["slug"]
+            test_client.get(f"/api/blog/{slug}")
+
+    thread = threading.Thread(target=write_then_shut_down, daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive()
+
+    with TestClient(main.app) as test_client:
+        post = test_client.portal.call(main.db.blog_posts.find_one, {"title": "Shutdown post"})
+        test_client.portal.call(main.client.drop_database, main.db.name)
+    main.response_cache.invalidate_prefix("")
+    assert post["views"] == 1
@@ -0,0 +1,40 @@
+import main
+
+HEADER = "name,category,description,pricing,features,pros,cons,rating,affiliate_link,logo_url,website_url\n"
+
+
+def import_csv(client, body):
+    return client.post("/api/tools/import", content=HEADER + body, headers={"content-type": "text/csv"}).json()
+
+
+def test_empty_list_cells_import_as_empty_lists(client):
+    result = import_csv(client, "Pipedrive,Sales,Sales CRM,Paid,pipelines|reports,,,4.5,x,y,z\n")
+    assert (result["inserted"], result["rejected"]) == (1, 0)
+    tool = client.portal.call(main.db.saas_tools.find_one, {"name_key": "pipedrive"})
+    assert (tool["features"], tool["pros"], tool["cons"]) == (["pipelines", "reports"], [], [])
+
+
+def test_reimport_updates_by_normalized_name(client):
+    import_csv(client, "Pipedrive,Sales,Sales CRM,Paid,a,b,c,4.5,x,y,z\n")
+    result = import_csv(client, "  PIPEDRIVE ,Sales,Better CRM,Paid,a,b,c,4.7,x,y,z\n")
+    assert (result["inserted"], result["updated"]) == (0, 1)
+
+
+def test_batches_written_after_a_mid_import_refresh_are_indexed(client, monkeypatch):
+    monkeypatch.setattr(main, "TOOL_IMPORT_BATCH_SIZE", 1)
+    write_tool_batch = main.write_tool_batch
+
+    async def refresh_then_write(batch):
+        # An index refresh that lands between two batches of the import
+        await main.related_tools_index.refresh(main.db.saas_tools)
+        return await write_tool_batch(batch)
+
+    monkeypatch.setattr(main, "write_tool_batch", refresh_then_write)
+    import_csv(client, "".join(f"Tool {index},Sales,CRM,Paid,a,b,c,4.5,x,y,z\n" for index in range(3)))
+
+    async def refresh_and_list_ids():
+        await main.related_tools_index.refresh(main.db.saas_tools)
+        return [tool["id"] async for tool in main.db.saas_tools.find({}, {"id": 1})]
+
+    ids = client.portal.call(refresh_and_list_ids)
+    assert len(ids) == 3 and all(tool_id in main.related_tools_index.terms for tool_id in ids)
@@ -0,0 +1,21 @@
+import pytest
+
+import main
+
+
+@pytest.fixture
+def index():
+    index = main.ToolSearchIndex()
+    index.add({"id": "1", "name": "Pipedrive", "description": "Sales CRM", "category": "Sales", "pricing": "Paid", "rating": 4.5})
+    index.add({"id": "2", "name": "Mailchimp", "description": "Email marketing", "category": "Email", "pricing": "Freemium", "rating": 4.2})
+    return index
+
+
+@pytest.mark.parametrize("query", [".*", "!!!", "   "])
+def test_queries_without_tokens_match_nothing(index, query):
+    assert index.search(query) == []
+
+
+def test_pricing_only_query_filters_every_tool(index):
+    assert index.search(None, pricing_type="paid") == ["1"]
+    assert index.search(None) == ["1", "2"]
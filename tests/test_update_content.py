@@ -0,0 +1,31 @@
+import pytest
+
+import main
+
+
+@pytest.fixture
+def posts(client):
+    for title in ("First refresh post", "Second refresh post", "Third refresh post"):
+        client.post("/api/blog", json={"title": title, "category": "Sales", "generate_content": False})
+
+
+@pytest.mark.parametrize("count, expected", [(0, 0), (2, 2)])
+def test_update_content_refreshes_at_most_count_posts(client, posts, count, expected):
+    response = client.post("/api/blog/update-content", params={"count": count}).json()
+    assert response["updated_count"] == expected
+
+
+def test_background_update_content_with_zero_count_queues_nothing(client, posts):
+    job_id = client.post("/api/blog/update-content", params={"count": 0, "background": True}).json()["job_id"]
+    assert client.get(f"/api/jobs/{job_id}").json()["progress"]["total"] == 0
+
+
+def test_negative_count_is_rejected(client):
+    assert client.post("/api/blog/update-content", params={"count": -1}).status_code == 422
+
+
+def test_fallback_refresh_renders_affiliate_content(client, posts):
+    client.post("/api/blog/update-content", params={"count": 3})
+    post = client.portal.call(main.db.blog_posts.find_one, {"title": "First refresh post"})
+    assert "First refresh post" in post["content"]
+    assert [link["name"] for link in post["affiliate_links"]] == ["Mailmodo", "CJ Affiliate"]
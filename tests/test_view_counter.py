@@ -0,0 +1,23 @@
+import asyncio
+
+import main
+
+
+class StalledCollection:
+    async def bulk_write(self, requests, ordered=True):
+        await asyncio.sleep(60)
+
+
+def test_cancelled_flush_keeps_its_counts():
+    async def cancel_mid_flush():
+        counter = main.ViewCounter()
+        counter.increment("a-post")
+        counter.increment("a-post")
+        flush = asyncio.create_task(counter.flush(StalledCollection()))
+        await asyncio.sleep(0)
+        counter.increment("a-post")
+        flush.cancel()
+        await asyncio.gather(flush, return_exceptions=True)
+        return counter.pending
+
+    assert asyncio.run(cancel_mid_flush()) == {"a-post": 3}